@@ -0,0 +1,151 @@
+#bench_graphlets.py - timing and peak memory benchmarks for graphlet construction, mapping and rendering
+"""
+Generate synthetic data like the notebook's sample (flag, category and continuous columns
+versus datetime), scaled over row and flag-column counts, and benchmark each stage separately:
+GraphletCategorical, GraphletContinuous, CreateCombinedFlagColSeries, MapSerToAltVals,
+RescaleSerValues and full Agg rendering to PNG.
+
+Each result records the best wall time of --repeat runs and the peak traced memory of one
+additional run (tracemalloc). Results are written as JSON so runs can be compared.
+
+Example:
+python benchmarks/bench_graphlets.py --rows 1e3 1e5 1e7 --flags 1 10 100 --out bench.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import tempfile
+from datetime import timedelta
+import pandas as pd
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+
+#Import JDL utility modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'libs'))
+import graphlet_plot
+from graphlet_plot import pd_util
+
+datetime_col, cats_col, cont_col = 'datetime', 'cats', 'continuous'
+spacing = (10, 5)
+
+def SampleData(nrows, nflags, seed=0):
+    """Return DataFrame of nrows with datetime, category, continuous and nflags 1/blank flag columns"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({datetime_col: pd.date_range('1/1/2020', periods=nrows, freq='s'),
+                       cats_col: rng.choice(['A', 'B', 'C'], nrows),
+                       cont_col: rng.uniform(0, 100, nrows)})
+    for i in range(nflags):
+        df['flag' + str(i)] = np.where(rng.random(nrows) < 0.05, 1.0, np.nan)
+    return df
+
+def FlagCols(df):
+    return [col for col in df.columns if col.startswith('flag')]
+
+def SampleConfig(df):
+    """Return graphlet plot configuration like the notebook's four-graphlet example"""
+    return {'graphlets': ['cats1', 'cats2', 'cont1', 'cont2'], 'spacing': spacing,
+            'GraphletIsCategorical': {'cats1': True, 'cats2': True, 'cont1': False, 'cont2': False},
+            'dot_formats': {'cats1': ('xkcd:magenta', 50, 0.75), 'cats2': ('xkcd:ocean', 50, 0.75),
+                            'cont1': ('xkcd:black', 100, 1.0), 'cont2': ('xkcd:bright orange', 100, 1.0)},
+            'headings': {'cats1': 'Categories', 'cats2': 'Multiple Flag Columns',
+                         'cont1': 'Continuous y variable', 'cont2': 'Rescaled Continuous y'},
+            'ylims': {'cats1': (100 + (2 * spacing[1]), None), 'cats2': (None, 0 - (2 * spacing[1])),
+                      'cont1': (0, 100), 'cont2': (-125, -30)},
+            'scale_orig': {'cats1': None, 'cats2': None, 'cont1': None, 'cont2': (0, 100)},
+            'scale_scaled': {'cats1': None, 'cats2': None, 'cont1': None, 'cont2': (-125, -25)},
+            'hline': {'cats1': True, 'cats2': True, 'cont1': True, 'cont2': False},
+            'ticklabels': {'cats1': {'A': 'Type_A', 'B': 'Type_B', 'C': 'Type_C'},
+                           'cont1': dict(zip([0, 25, 50, 75, 100], [0, 25, 50, 75, 100])),
+                           'cont2': dict(zip([0, 25, 50, 75], ['0hrs', '6hrs', '12hrs', '18hrs']))},
+            'data_cols': {'cats1': (datetime_col, cats_col), 'cats2': (datetime_col, FlagCols(df)),
+                          'cont1': (datetime_col, cont_col), 'cont2': (datetime_col, cont_col)},
+            'plot': {'title': '\nBenchmark Plot'}}
+
+def Benchmarks(df, fpath_png):
+    """Return dictionary of benchmark name and no-argument function to time"""
+    t_range = (df[datetime_col].min() - timedelta(days=1), df[datetime_col].max() + timedelta(days=1))
+    lst_flags = [(df, col, datetime_col) for col in FlagCols(df)]
+    data_cats, data_cont = (df[datetime_col], df[cats_col]), (df[datetime_col], df[cont_col])
+    config = SampleConfig(df)
+    return {'GraphletCategorical': lambda: graphlet_plot.GraphletCategorical(t_range, spacing, (110, None), data_cats,
+                                                                             True, None, 'cats', ('k', 50, 0.75)),
+            'GraphletContinuous': lambda: graphlet_plot.GraphletContinuous(t_range, spacing, (-125, -30), data_cont,
+                                                                           True, None, 'cont', (0, 100), (-125, -25),
+                                                                           ('k', 100, 1.0)),
+            'CreateCombinedFlagColSeries': lambda: graphlet_plot.GraphletCategorical.CreateCombinedFlagColSeries(lst_flags),
+            'MapSerToAltVals': lambda: pd_util.MapSerToAltVals(df[cats_col], ['A', 'B', 'C'], [110, 120, 130]),
+            'RescaleSerValues': lambda: pd_util.RescaleSerValues(df[cont_col], (0, 100), (-125, -25)),
+            'RenderPNG': lambda: graphlet_plot.RenderGraphletFigure(config, df, fpath_png)}
+
+def TimeBench(fn, repeat, IsMemory):
+    """Return best wall time (seconds) of repeat calls and, optionally, peak traced bytes of one more call"""
+    best = None
+    for i in range(repeat):
+        t_start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t_start
+        if (best is None) or (elapsed < best): best = elapsed
+    peak = None
+    if IsMemory:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return best, peak
+
+def RunBenchmarks(lst_rows, lst_nflags, repeat=3, IsMemory=True, max_cells=1e8, lst_names=None):
+    """
+    Run benchmarks over row and flag-column counts
+
+    Only CreateCombinedFlagColSeries and RenderPNG depend on flag count; the other benchmarks
+    run once per row count (with the first flag count). Combinations with more than max_cells
+    flag values are skipped
+
+    Returns:
+    list of result dictionaries (bench, rows, flags, seconds, peak_bytes)
+    """
+    results = []
+    fpath_png = os.path.join(tempfile.mkdtemp(), 'bench.png')
+    for nrows in lst_rows:
+        for k, nflags in enumerate(lst_nflags):
+            if nrows * nflags > max_cells: continue
+            df = SampleData(nrows, nflags)
+            for name, fn in Benchmarks(df, fpath_png).items():
+                if (lst_names is not None) and (not name in lst_names): continue
+                if (k > 0) and (not name in ['CreateCombinedFlagColSeries', 'RenderPNG']): continue
+                seconds, peak = TimeBench(fn, repeat, IsMemory)
+                results.append({'bench': name, 'rows': nrows, 'flags': nflags,
+                                'seconds': round(seconds, 6), 'peak_bytes': peak})
+                print('{:<28} rows={:<10} flags={:<4} {:>10.4f} s  peak={}'.format(name, nrows, nflags, seconds, peak))
+    return results
+
+def Metadata():
+    """Return environment description for a benchmark run"""
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'platform': platform.platform(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'matplotlib': matplotlib.__version__}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark graphlet construction, mapping and rendering')
+    parser.add_argument('--rows', nargs='+', type=float, default=[1e3, 1e4, 1e5, 1e6, 1e7])
+    parser.add_argument('--flags', nargs='+', type=int, default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-cells', type=float, default=1e8, help='skip rows x flags combinations above this')
+    parser.add_argument('--bench', nargs='+', default=None, help='subset of benchmark names to run')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak memory run')
+    parser.add_argument('--out', default='bench_results.json', help='JSON results file')
+    args = parser.parse_args(argv)
+
+    results = RunBenchmarks([int(n) for n in args.rows], args.flags, args.repeat, not args.no_memory,
+                            args.max_cells, args.bench)
+    with open(args.out, 'w') as f:
+        json.dump({'meta': Metadata(), 'results': results}, f, indent=1)
+    print('Results written to', args.out)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+#graphlet_plot - graphlet-based time series plots using Matplotlib
+"""
+The plotting classes and functions of graphlet_plot.plot (Graphlet, GraphletCategorical,
+GraphletContinuous, GraphletPlot, BuildGraphletsFromConfig, RenderGraphletFigure...) are
+available as package attributes. They are imported on first access, so the command line
+(python -m graphlet_plot) and the light submodules don't import Pandas or NumPy up front
+"""
+import importlib
+
+Submodules = ['plot', 'pd_util', 'util', 'colinfo', 'batch', 'cache', 'facet', 'export', 'pyramid', 'cli']
+
+def __getattr__(name):
+    """Return submodule name, or attribute name of graphlet_plot.plot (importing either on first use)"""
+    if name in Submodules: return importlib.import_module('.' + name, __name__)
+    plot = importlib.import_module('.plot', __name__)
+    try:
+        return getattr(plot, name)
+    except AttributeError:
+        raise AttributeError("module 'graphlet_plot' has no attribute " + repr(name)) from None
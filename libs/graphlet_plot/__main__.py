@@ -0,0 +1,5 @@
+#Run the command line (python -m graphlet_plot render config.json)
+import sys
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,73 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import matplotlib
+
+#Import JDL utility modules
+from . import plot as graphlet_plot
+
+#graphlet_plot/batch.py - render many graphlet plots in a process pool
+
+#Plot configuration shared by all jobs in a worker process (set once by InitWorker)
+WorkerConfig = None
+
+def InitWorker(config):
+    """Process pool initializer: select the Agg backend and keep config for the worker's jobs"""
+    global WorkerConfig
+    matplotlib.use('Agg')
+    WorkerConfig = config
+
+def RenderJob(name, df, fpath):
+    """
+    Render one dataset with the worker's shared config
+
+    Returns:
+    Dictionary of job name, output path, elapsed seconds and error (traceback string or None)
+    """
+    t_start = time.perf_counter()
+    result = {'name':name, 'path':fpath, 'seconds':None, 'error':None}
+    try:
+        graphlet_plot.RenderGraphletFigure(WorkerConfig, df, fpath)
+    except Exception:
+        result['path'] = None
+        result['error'] = traceback.format_exc()
+    result['seconds'] = round(time.perf_counter() - t_start, 4)
+    return result
+
+def RenderBatch(config, datasets, out_dir, fmt='png', n_workers=None, max_pending=None):
+    """
+    Render a graphlet plot for each dataset in parallel worker processes and write the files
+
+    The plot configuration (see graphlet_plot.BuildGraphletsFromConfig) is sent to each
+    worker once when the pool starts rather than with every job. datasets is consumed
+    lazily and at most max_pending jobs are in flight, so a generator of DataFrames
+    isn't materialized all at once. A failed job is reported and doesn't stop the batch
+
+    Args:
+    config (Dict) - graphlet plot configuration shared by all plots
+    datasets (iterable) - (name, DataFrame) tuples; name is the output file's base name
+    out_dir (String) - directory path for the output files
+    fmt (String) - output file format/extension such as 'png', 'svg' or 'pdf'
+    n_workers (Integer) - number of worker processes; default is the CPU count
+    max_pending (Integer) - maximum jobs submitted but not finished; default 2 per worker
+
+    Returns:
+    list of job result dictionaries (name, path, seconds, error) in dataset order
+    """
+    if n_workers is None: n_workers = os.cpu_count() or 1
+    if max_pending is None: max_pending = 2 * n_workers
+    os.makedirs(out_dir, exist_ok=True)
+
+    results, pending = {}, {}
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=InitWorker, initargs=(config,)) as executor:
+        for i, (name, df) in enumerate(datasets):
+            fpath = os.path.join(out_dir, str(name) + '.' + fmt)
+            pending[executor.submit(RenderJob, name, df, fpath)] = i
+
+            #Wait for a job to finish before submitting more
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done: results[pending.pop(future)] = future.result()
+        for future in list(pending): results[pending.pop(future)] = future.result()
+    return [results[i] for i in sorted(results)]
@@ -0,0 +1,175 @@
+import os
+import io
+import hashlib
+import numpy as np
+import pandas as pd
+import matplotlib
+
+#Import JDL utility modules
+from . import plot as graphlet_plot
+from . import pyramid as graphlet_pyramid
+from . import util
+
+#graphlet_plot/cache.py - content-addressed disk cache of rendered graphlet figures
+
+class RenderCache():
+    """
+    Serve rendered graphlet figures (PNG, SVG...) from a local disk cache keyed by content
+
+    The key fingerprints the configuration dictionary, the DataFrame columns it plots
+    (a hash of their underlying arrays), the manifests of the pyramids it reads, t_range,
+    output format and Matplotlib version.
+    A hit returns the stored bytes without building graphlets or touching Matplotlib.
+    Entries are files named by key; hits refresh a file's modification time, and the
+    least recently used files are evicted once the cache exceeds max_bytes
+
+    Attributes:
+    dir_cache [string] - cache folder (created if needed)
+    max_bytes [integer] - size bound of the cache folder's entries
+    hits, misses [integers] - counts of Render calls served from and added to the cache
+
+    Methods:
+    Render
+    Key
+    Get
+    Put
+    Evict
+    Stats
+    """
+    def __init__(self, dir_cache, max_bytes=256 * 2**20):
+        self.dir_cache = dir_cache
+        self.max_bytes = max_bytes
+        self.hits, self.misses = 0, 0
+        os.makedirs(dir_cache, exist_ok=True)
+
+    def Render(self, config, df, fmt='png', t_range=None):
+        """
+        Return figure bytes for config and df, rendering with RenderGraphletFigure only on a miss
+
+        Args:
+        config (Dict) - graphlet plot configuration (see graphlet_plot.BuildGraphletsFromConfig)
+        df (Pandas DataFrame) - data for the plot
+        fmt [string] - output format such as 'png' or 'svg'
+        t_range [tuple - datetime format] - optional plot range
+        """
+        key = self.Key(config, df, fmt, t_range)
+        data = self.Get(key, fmt)
+        if data is not None:
+            self.hits += 1
+            return data
+        self.misses += 1
+        buf = io.BytesIO()
+        graphlet_plot.RenderGraphletFigure(config, df, buf, t_range, fmt)
+        data = buf.getvalue()
+        self.Put(key, fmt, data)
+        return data
+
+    def Key(self, config, df, fmt='png', t_range=None):
+        """Return hex fingerprint of config, plotted df columns and pyramids, t_range, format and Matplotlib version"""
+        with util.Stage('RenderCache.key', 0 if df is None else len(df)):
+            h = hashlib.blake2b(digest_size=16)
+            h.update(CanonicalRepr([config, t_range, fmt, matplotlib.__version__]).encode())
+            for col in graphlet_plot.ConfigDataColumns(config):
+                h.update(ColumnDigest(df[col]))
+            for pyramid in ConfigPyramids(config):
+                h.update(PyramidDigest(pyramid))
+        return h.hexdigest()
+
+    def Path(self, key, fmt):
+        """Return cache file path for key and format"""
+        return os.path.join(self.dir_cache, key + '.' + fmt)
+
+    def Get(self, key, fmt):
+        """Return cached bytes for key (refreshing its LRU time) or None if not cached"""
+        fpath = self.Path(key, fmt)
+        try:
+            with open(fpath, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(fpath)
+        return data
+
+    def Put(self, key, fmt, data):
+        """Store bytes for key (atomic replace) and evict least recently used entries over max_bytes"""
+        fpath = self.Path(key, fmt)
+        with open(fpath + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(fpath + '.tmp', fpath)
+        self.Evict()
+
+    def Evict(self):
+        """Remove least recently used entries until the cache is within max_bytes"""
+        lst_entries = self.Entries()
+        nbytes = sum(entry[2] for entry in lst_entries)
+        for mtime, fpath, size in sorted(lst_entries):
+            if nbytes <= self.max_bytes: break
+            os.remove(fpath)
+            nbytes -= size
+
+    def Entries(self):
+        """Return list of (modification time, path, size in bytes) of cache entries"""
+        lst_entries = []
+        for f in os.listdir(self.dir_cache):
+            if f.endswith('.tmp'): continue
+            st = os.stat(os.path.join(self.dir_cache, f))
+            lst_entries.append((st.st_mtime_ns, os.path.join(self.dir_cache, f), st.st_size))
+        return lst_entries
+
+    def Stats(self):
+        """Return dictionary of hits, misses, number of entries and their total bytes"""
+        lst_entries = self.Entries()
+        return {'hits':self.hits, 'misses':self.misses, 'entries':len(lst_entries),
+                'bytes':sum(entry[2] for entry in lst_entries)}
+
+def ColumnDigest(ser):
+    """
+    Return digest of a Series' name, dtype and values
+
+    Numeric, boolean and datetime values are hashed straight from their array's bytes;
+    other (e.g. string/object) values via their vectorized Pandas hashes
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((ser.name, str(ser.dtype), len(ser))).encode())
+    arr = ser.to_numpy()
+    if not arr.dtype.kind in 'biufcmM':
+        arr = pd.util.hash_pandas_object(ser, index=False).to_numpy()
+    h.update(np.ascontiguousarray(arr).view('uint8'))
+    return h.digest()
+
+def ConfigPyramids(config):
+    """Return list of the pyramids (folder paths or Pyramid instances) named in config['pyramid']"""
+    dict_pyramids = config.get('pyramid', {})
+    return [dict_pyramids[g] for g in config['graphlets'] if dict_pyramids.get(g) is not None]
+
+def PyramidDigest(pyramid):
+    """
+    Return digest of a pyramid's folder path and manifest
+
+    The manifest holds t0, bucket width and each level's length, so rebuilding or
+    extending the pyramid changes it; its modification time covers rebuilds that
+    happen to keep the same manifest
+    """
+    dir_pyramid = getattr(pyramid, 'dir_pyramid', pyramid)
+    fpath = os.path.join(dir_pyramid, graphlet_pyramid.ManifestFile)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((os.path.abspath(dir_pyramid), os.stat(fpath).st_mtime_ns)).encode())
+    with open(fpath, 'rb') as f:
+        h.update(f.read())
+    return h.digest()
+
+def CanonicalRepr(obj):
+    """
+    Return repr of obj with dictionary items (recursively) in sorted key order
+
+    A Pyramid is represented by its folder path, the same as a config naming the folder
+    (its contents are fingerprinted by PyramidDigest), so keys don't depend on object
+    addresses
+    """
+    if isinstance(obj, graphlet_pyramid.Pyramid): return repr(obj.dir_pyramid)
+    if isinstance(obj, dict):
+        lst_items = sorted(((CanonicalRepr(k), CanonicalRepr(v)) for k, v in obj.items()))
+        return '{' + ', '.join(k + ': ' + v for k, v in lst_items) + '}'
+    if isinstance(obj, (list, tuple)):
+        return type(obj).__name__ + '[' + ', '.join(CanonicalRepr(item) for item in obj) + ']'
+    return repr(obj)
@@ -0,0 +1,177 @@
+"""
+Command line rendering of graphlet plots from a JSON configuration
+
+Commands (also run as python -m graphlet_plot <command>):
+render <config.json> [--data FILE] [--out FILE] [--format FMT] [--t-range START END]
+validate <config.json> [--data FILE]
+version
+
+The JSON configuration has the keys of graphlet_plot.BuildGraphletsFromConfig (the
+notebook's per-graphlet dictionaries keyed by graphlet name) plus an optional
+"data": {"file": <csv or parquet path>} and "plot": {"out": <output path>}. Graphlets
+with a "pyramid" folder need no data_cols, and no data file if all graphlets have one.
+Relative paths are relative to the configuration file. Pandas and Matplotlib (Agg
+backend) are imported only by render, so validate and version start without them
+"""
+import os
+import sys
+import json
+import argparse
+
+#Per-graphlet dictionaries required in a configuration (keyed by graphlet name); data_cols is not required
+#for pyramid graphlets
+GraphletKeys = ['GraphletIsCategorical', 'dot_formats', 'headings', 'ylims', 'scale_orig', 'scale_scaled', 'hline', 'data_cols']
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='graphlet_plot', description='Render graphlet plots from a JSON configuration')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    parser_render = subparsers.add_parser('render', help='render a plot with the Agg backend')
+    parser_render.add_argument('config', help='JSON configuration file')
+    parser_render.add_argument('--data', help='csv or parquet data file (default: config data.file)')
+    parser_render.add_argument('--out', help='output file (default: config plot.out or <config name>.png)')
+    parser_render.add_argument('--format', help='output format such as png or svg (default: from --out extension)')
+    parser_render.add_argument('--t-range', nargs=2, metavar=('START', 'END'), help='plot datetime range')
+    parser_validate = subparsers.add_parser('validate', help='check a configuration without rendering')
+    parser_validate.add_argument('config', help='JSON configuration file')
+    parser_validate.add_argument('--data', help='csv or parquet data file (default: config data.file)')
+    subparsers.add_parser('version', help='print the package version')
+    args = parser.parse_args(argv)
+
+    if args.command == 'version':
+        print(PackageVersion())
+        return 0
+    config = LoadConfig(args.config)
+    lst_errors = ValidateConfig(config, args.data)
+    if len(lst_errors) > 0:
+        for error in lst_errors: print('Error:', error, file=sys.stderr)
+        return 1
+    if args.command == 'validate':
+        print('OK:', args.config, '-', len(config['graphlets']), 'graphlets')
+        return 0
+    fpath = Render(config, args.config, args.data, args.out, args.format, args.t_range)
+    print(fpath)
+    return 0
+
+def LoadConfig(fpath):
+    """
+    Read a JSON configuration and restore the Python types of the notebook's dictionaries
+
+    JSON lists become tuples (spacing, ylims, dot_formats, scale limits, data_cols, plot
+    sizes) and the ticklabels keys of continuous graphlets become numbers. Categorical
+    ticklabels keys are matched to the data's category types by Render (see
+    TicklabelsForData)
+    """
+    with open(fpath) as f:
+        config = json.load(f)
+    if 'spacing' in config: config['spacing'] = tuple(config['spacing'])
+    for key in ['dot_formats', 'ylims', 'scale_orig', 'scale_scaled', 'data_cols']:
+        for g, val in config.get(key, {}).items():
+            if isinstance(val, list): config[key][g] = tuple(val)
+    for g, ticklabels in config.get('ticklabels', {}).items():
+        if (ticklabels is not None) and (not config.get('GraphletIsCategorical', {}).get(g, True)):
+            config['ticklabels'][g] = {NumberFromString(k): v for k, v in ticklabels.items()}
+    for key in ['sizes', 'figsize']:
+        if key in config.get('plot', {}): config['plot'][key] = tuple(config['plot'][key])
+    return config
+
+def NumberFromString(s):
+    """Return integer or float value of a numeric string"""
+    try:
+        return int(s)
+    except ValueError:
+        return float(s)
+
+def ValidateConfig(config, fpath_data=None):
+    """Return list of error descriptions for a configuration and optional data file argument (empty if valid)"""
+    lst_errors = []
+    for key in ['graphlets', 'spacing'] + [key for key in GraphletKeys if key != 'data_cols']:
+        if not key in config: lst_errors.append('missing key ' + key)
+    if len(lst_errors) > 0: return lst_errors
+    lst_data = [g for g in config['graphlets'] if not IsPyramidGraphlet(config, g)]
+    if (len(lst_data) > 0) and (fpath_data is None) and (not config.get('data', {}).get('file')):
+        lst_errors.append('no data file: set data.file in the configuration or pass --data')
+    if len(config['spacing']) != 2: lst_errors.append('spacing must have 2 items')
+    for g in config['graphlets']:
+        lst_keys = GraphletKeys if g in lst_data else [key for key in GraphletKeys if key != 'data_cols']
+        lst_missing = [key for key in lst_keys if not g in config.get(key, {})]
+        if len(lst_missing) > 0:
+            lst_errors.append(g + ': missing from ' + ', '.join(lst_missing))
+            continue
+        if len(config['ylims'][g]) != 2: lst_errors.append(g + ': ylims must have 2 items')
+        if len(config['dot_formats'][g]) != 3: lst_errors.append(g + ': dot_formats must have 3 items')
+        if (g in lst_data) and (len(config['data_cols'][g]) < 2):
+            lst_errors.append(g + ': data_cols must have x and y columns')
+        if (not g in lst_data) and config['GraphletIsCategorical'][g]:
+            lst_errors.append(g + ': pyramid graphlets must be continuous')
+        if config['GraphletIsCategorical'][g]:
+            if (config['ylims'][g][0] is None) and (config['ylims'][g][1] is None):
+                lst_errors.append(g + ': categorical ylims need ymin or ymax')
+        elif None in config['ylims'][g]:
+            lst_errors.append(g + ': continuous ylims need ymin and ymax')
+        if (config['scale_orig'][g] is None) != (config['scale_scaled'][g] is None):
+            lst_errors.append(g + ': specify both or neither of scale_orig and scale_scaled')
+    return lst_errors
+
+def Render(config, fpath_config, fpath_data=None, fpath_out=None, fmt=None, t_range=None):
+    """
+    Read the data file and render the configuration's plot to fpath_out with Agg; return fpath_out
+
+    Only the plotted columns are read; the data file is not read at all if every graphlet
+    plots a pyramid
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import pandas as pd
+    from . import plot as graphlet_plot
+
+    dir_config = os.path.dirname(os.path.abspath(fpath_config))
+    config = dict(config, pyramid={g: os.path.join(dir_config, p) for g, p in config.get('pyramid', {}).items()
+                                   if p is not None})
+    if fpath_out is None:
+        fpath_out = config.get('plot', {}).get('out', os.path.splitext(os.path.basename(fpath_config))[0] + '.png')
+        fpath_out = os.path.join(dir_config, fpath_out)
+
+    #Read only the plotted columns and parse x columns as dates
+    cols, df = graphlet_plot.ConfigDataColumns(config), None
+    if len(cols) > 0:
+        if fpath_data is None: fpath_data = os.path.join(dir_config, config['data']['file'])
+        if fpath_data.endswith('.parquet'):
+            df = pd.read_parquet(fpath_data, columns=cols)
+        else:
+            xcols = sorted(set(config['data_cols'][g][0] for g in config['graphlets']
+                               if not IsPyramidGraphlet(config, g)))
+            df = pd.read_csv(fpath_data, usecols=cols, parse_dates=xcols)
+        config = dict(config, ticklabels=TicklabelsForData(config, df))
+    if t_range is not None: t_range = (pd.Timestamp(t_range[0]), pd.Timestamp(t_range[1]))
+    return graphlet_plot.RenderGraphletFigure(config, df, fpath_out, t_range, fmt)
+
+def TicklabelsForData(config, df):
+    """
+    Return config's ticklabels with categorical keys converted to numbers where the graphlet's
+    y column is numeric
+
+    JSON keys are strings, while a numeric state column's categories are numbers (a key
+    such as "1" then labels category 1, or 1.0 in a column with nulls). Keys of string
+    columns and of combined flag columns stay strings
+    """
+    import pandas as pd
+    dict_ticklabels = dict(config.get('ticklabels', {}))
+    for g, ticklabels in dict_ticklabels.items():
+        if (ticklabels is None) or (not config['GraphletIsCategorical'].get(g, False)): continue
+        col = config['data_cols'][g][1]
+        if isinstance(col, (list, tuple)) or (not pd.api.types.is_numeric_dtype(df[col])): continue
+        dict_ticklabels[g] = {NumberFromString(k) if isinstance(k, str) else k: v for k, v in ticklabels.items()}
+    return dict_ticklabels
+
+def IsPyramidGraphlet(config, g):
+    """Return True if graphlet g plots a pyramid (same test as graphlet_plot.plot.IsPyramidGraphlet, without importing it)"""
+    return config.get('pyramid', {}).get(g) is not None
+
+def PackageVersion():
+    """Return installed package version ('unknown' if running from a source tree)"""
+    from importlib import metadata
+    try:
+        return metadata.version('graphlet-plot')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
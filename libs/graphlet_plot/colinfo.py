@@ -0,0 +1,366 @@
+import pandas as pd
+import numpy as np
+import math
+import os
+import itertools
+
+#Global Variables
+NameCI = 'name'
+DescCI = 'description'
+UnitsCI = 'units'
+XLFormatCI = 'xlformat'
+XLWidthCI = 'xlwidth'
+dfNameCI = 'df_name'
+Name_iCI = 'name_import'
+Name_fCI = 'name_export'
+Col_orderCI = 'col_order'
+DtypeCI = 'dtype'
+
+#ColInfo read from file by absolute path: (file modification time, ColInfoDict)
+ColInfoCache = {}
+
+class ColInfoDict(dict):
+    """
+    ColInfo dictionary of metadata sub-dictionaries with precomputed reverse-name maps
+
+    Works anywhere the plain nested ColInfo dictionary does
+
+    Attributes:
+    import_to_name [Dict] - ColInfo name by (non-blank) name_import
+    name_to_export [Dict] - (non-blank) name_export by ColInfo name
+
+    Methods:
+    BuildNameMaps
+    """
+    def __init__(self, dict_CI):
+        dict.__init__(self, dict_CI)
+        self.BuildNameMaps()
+
+    def BuildNameMaps(self):
+        """Build reverse-name maps (call again after modifying name_import or name_export)"""
+        self.import_to_name = {}
+        for k, v in self[Name_iCI].items():
+            if (not IsNullVal(v)) and (len(v) > 0) and (not v in self.import_to_name): self.import_to_name[v] = k
+        self.name_to_export = {}
+        for k, v in self[Name_fCI].items():
+            if (not IsNullVal(v)) and (len(v) > 0): self.name_to_export[k] = v
+
+#ReadColInfo - reads the col_info DataFrame to a nested dictionary
+#Column 1 of the col_info.csv contains column headings used as key for the other column info items (For example
+#data column 'Revenue' has Description, XLFormat and XLWidth equal to 'Annual Revenue', '$0.00' and '11',
+#respectively)
+def ReadColInfoFromFile(PathCIFile):
+    """Read column info into ColInfo dictionary/sub-dictionaries
+        Each sub-dictionary is a metadata attribute about the variables such as units, description etc.
+
+        Sub-dictionary names:
+        NameCI = 'name'
+        DescCI = 'description'
+        UnitsCI = 'units'
+        XLFormatCI = 'xlformat'
+        XLWidthCI = 'xlwidth'
+        dfNameCI = 'df_name'
+        Name_iCI = 'name_import'
+        Name_fCI = 'name_export'
+        Col_orderCI = 'col_order'
+        DtypeCI = 'dtype' (optional; included if the file has a dtype column)
+
+        The file is parsed once and cached until its modification time changes.
+        Each call returns its own copy, so callers can modify it
+
+    Args:
+        PathCIFile (String): directory path + filename for the column info *.csv file
+
+    Returns:
+        ColInfo (ColInfoDict): Dictionary/Sub-dictionaries with column info
+    """
+    key, mtime = os.path.abspath(PathCIFile), os.stat(PathCIFile).st_mtime_ns
+    if (not key in ColInfoCache) or (ColInfoCache[key][0] != mtime):
+
+        #Read the file and translate its columns to sub-dictionaries by variable name
+        df_CI = pd.read_csv(PathCIFile, index_col=NameCI)
+        lst_CI = [DescCI, UnitsCI, XLFormatCI, XLWidthCI, Name_iCI, Name_fCI, Col_orderCI]
+        if DtypeCI in df_CI.columns: lst_CI.append(DtypeCI)
+        ColInfoCache[key] = (mtime, ColInfoDict(df_CI[lst_CI].to_dict()))
+    return ColInfoDict({k: dict(v) for k, v in ColInfoCache[key][1].items()})
+
+#RefreshColInfoToFile - refreshes col_info.csv based on dictionary contents; adds file rows as needed
+def RefreshColInfoToFile(PathCIFile, ColInfo):
+
+    #Read the col_info file to be updated
+    df_CI = pd.read_csv(PathCIFile, index_col=NameCI)
+
+    #Iterate over dictionaries in ColInfo and over variables (keys); update/append to df_CI
+    for CI_dict in ColInfo:
+        for var in CI_dict:
+            df_CI.loc[var,CI_dict] = ColInfo[CI_dict][var]
+    df_CI.to_csv(PathCIFile)
+    return
+
+#BuildXLWriterLists - Uses number format and column width ColInfo to build needed XLWriter lists
+def BuildXLWriterLists(df, ColInfo):
+
+    #Initialize lists with placeholder for index - Works for single index
+    lst_fmts = ['0']
+    lst_widths = [10]
+
+    #Populate format and width for index; xxx Need to address case of multiindex
+    if df.index.names[0] is not None and df.index.name in ColInfo[XLFormatCI]:
+        lst_fmts = [ColInfo[XLFormatCI][df.index.name]]
+        lst_widths = [ColInfo[XLWidthCI][df.index.name]]
+
+    #Iterate through df columns and add number format and column width to the lists
+    for col in df.columns:
+        if col in ColInfo[XLFormatCI] and col in ColInfo[XLWidthCI]:
+            lst_fmts.append(ColInfo[XLFormatCI][col])
+            lst_widths.append(ColInfo[XLWidthCI][col])
+        else:
+            lst_fmts.append('0')
+            lst_widths.append(10)
+
+    #Get rid of quotation marks that prevent formats from working with ExcelWriter
+    lst_fmts = ListReplaceNaN(lst_fmts,'')
+    lst_fmts = [s.replace('"', '') for s in lst_fmts]
+    lst_widths = ListReplaceNaN(lst_widths,0)
+    return lst_fmts, lst_widths
+
+#Toggles val to blank string if val is nan values
+def SetVal(val):
+    retval = val
+    if isinstance(val , float) and np.isnan(val): retval = ''
+    return str(retval)
+
+def CreateExcelStepsDF(lst_dfs, lst_XLshts, ColInfo):
+
+    #Add needed ColInfo entries for ExcelSteps worksheet
+    ColInfo[XLFormatCI]['Formula/List Name/Sort-by'] = '@'
+    ColInfo[XLFormatCI]['Number Format'] = '@'
+
+    dictC = {1:'Sheet', 2:'Column',3:'Step',4:'Comment',5:'Number Format',6:'Width'}
+    lst_cols = ['Sheet', 'Column', 'Step', 'Formula/List Name/Sort-by', 'After or End Column',
+                'Keep Formulas', 'Comment', 'Number Format', 'Width']
+    dict_desc, dict_units = ColInfo[DescCI], ColInfo[UnitsCI]
+    dict_fmts, dict_widths = ColInfo[XLFormatCI], ColInfo[XLWidthCI]
+
+    #Collect ExcelSteps recipe rows and create the DataFrame once at the end
+    lst_rows = []
+    for dframe, sht in zip(lst_dfs, lst_XLshts):
+        lst_dfCols = list(dframe.index.names) + dframe.columns.tolist()
+
+        #Iterate through columns and add ExcelSteps recipe rows
+        for col in lst_dfCols:
+            if not col in dict_desc: continue
+            comment = SetVal(dict_desc[col])
+            ucomment = SetVal(dict_units[col])
+            if len(ucomment) > 0: comment = comment + ' in ' + ucomment
+
+            lst_rows.append({dictC[1]:sht, dictC[2]:col, dictC[3]:'Col_Format', dictC[4]:comment,
+                             dictC[5]: dict_fmts[col],dictC[6]: dict_widths[col]})
+
+        #Add Tbl_FreezeRow1 to end of recipe and a blank row to create spacing in the recipe
+        lst_rows.append({dictC[1]:np.nan})
+        lst_rows.append({dictC[1]:sht, dictC[3]:'Tbl_FreezeRow1'})
+        lst_rows.append({dictC[1]:np.nan})
+
+    df_ExcelSteps = pd.DataFrame(lst_rows, columns=lst_cols, dtype=object)
+
+    #Name the ExcelSteps df's index
+    if len(lst_rows) > 0: df_ExcelSteps.index.name = 'row'
+
+    lst_dfs.append(df_ExcelSteps)
+    lst_XLshts.append('ExcelSteps')
+    return lst_dfs, lst_XLshts, ColInfo
+
+def WriteExcelWorkbook(lst_dfs, lst_shts, fName_xlsx, ColInfo, IsExcelSteps, chunksize=10000):
+    """Write DataFrames (or iterables of DataFrame chunks) to xlsx sheets with ColInfo formats and widths
+        using XLWriter. Optionally add an ExcelSteps recipe sheet
+
+    Args:
+        lst_dfs (list): sheet sources; each a DataFrame or an iterable of DataFrame chunks such as
+                        pd.read_csv(..., chunksize=n)
+        lst_shts (String List): sheet names
+        fName_xlsx (String): directory path + filename of the xlsx file
+        ColInfo (Dict): Column Info dictionary of metadata property dictionaries (not modified)
+        IsExcelSteps (Boolean): toggles adding the ExcelSteps sheet
+        chunksize (Integer): rows per chunk for writing DataFrame sources
+
+    Returns:
+        status message (String)
+    """
+    lst_fmts = []
+    lst_colwidths = []
+    retval = fName_xlsx + ' Written Successfully'
+    if len(lst_dfs) != len(lst_shts): return 'ERROR: Must be same number of dfs and shts'
+
+    #Make local copy so ColInfo doesn't get modified
+    Col_Info_l = {k: dict(v) for k, v in ColInfo.items()}
+
+    #Chunked sources are peeked (first chunk kept) so their columns are known up front
+    lst_heads, lst_sources = [], []
+    for source in lst_dfs:
+        df_head, source = PeekSheetSource(source)
+        lst_heads.append(df_head)
+        lst_sources.append(source)
+    lst_shts = list(lst_shts)
+    if IsExcelSteps:
+        lst_heads, lst_shts, Col_Info_l = CreateExcelStepsDF(lst_heads, lst_shts, Col_Info_l)
+        lst_sources.append(lst_heads[-1])
+
+    for df_head in lst_heads:
+        fmts, widths = BuildXLWriterLists(df_head, Col_Info_l)
+        lst_fmts.append(fmts)
+        lst_colwidths.append(widths)
+
+    #Text format for ExcelSteps Formula and Number Format columns
+    if IsExcelSteps:
+        i = len(lst_sources) - 1
+        lst_fmts[i][4], lst_fmts[i][8] = '@', '@'
+    XLWriter(fName_xlsx, lst_sources, lst_shts, lst_fmts, lst_colwidths, chunksize)
+    return retval
+
+def PeekSheetSource(source):
+    """Return an empty DataFrame with a sheet source's columns and index name, and the (still
+        complete) source. Sources are DataFrames or iterables of DataFrame chunks"""
+    if isinstance(source, pd.DataFrame): return source.iloc[:0], source
+    it = iter(source)
+    first = next(it, None)
+    if first is None: return pd.DataFrame(), []
+    return first.iloc[:0], itertools.chain([first], it)
+
+def IterSheetChunks(source, chunksize):
+    """Yield row chunks of a DataFrame or pass through the chunks of an iterable source"""
+    if isinstance(source, pd.DataFrame):
+        for i in range(0, max(len(source), 1), chunksize): yield source.iloc[i:i + chunksize]
+    else:
+        for chunk in source: yield chunk
+
+def XLWriter(fName_xlsx, lst_sources, lst_shts, lst_fmts, lst_colwidths, chunksize=10000):
+    """Stream sheets to an xlsx workbook chunk by chunk using xlsxwriter's constant-memory mode
+
+    Rows are written in order and flushed as the writer moves on, so peak memory is bounded by
+    the chunk size rather than the workbook size. Each column's number format and width are set
+    once (set_column) rather than per cell. The index is written as the first column
+
+    Args:
+        fName_xlsx (String): directory path + filename of the xlsx file
+        lst_sources (list): DataFrames or iterables of DataFrame chunks
+        lst_shts (String List): sheet names
+        lst_fmts, lst_colwidths (lists of lists): number format and width by column (index first)
+                                                  for each sheet as from BuildXLWriterLists
+        chunksize (Integer): rows per chunk for DataFrame sources
+    """
+    import xlsxwriter
+
+    wb = xlsxwriter.Workbook(fName_xlsx, {'constant_memory': True, 'remove_timezone': True})
+    dict_xlfmts = {}
+    for source, sht, fmts, widths in zip(lst_sources, lst_shts, lst_fmts, lst_colwidths):
+        ws = wb.add_worksheet(sht)
+        irow = 0
+        for chunk in IterSheetChunks(source, chunksize):
+            df_rows = chunk.reset_index()
+
+            #Set column formats and widths and write the header from the first chunk
+            if irow == 0:
+                for j, (fmt, width) in enumerate(zip(fmts, widths)):
+                    if (fmt == '0') and pd.api.types.is_datetime64_any_dtype(df_rows.iloc[:, j]):
+                        fmt = 'yyyy-mm-dd hh:mm:ss'
+                    if not fmt in dict_xlfmts: dict_xlfmts[fmt] = wb.add_format({'num_format': fmt})
+                    ws.set_column(j, j, width, dict_xlfmts[fmt])
+                ws.write_row(0, 0, [str(col) for col in df_rows.columns])
+                irow = 1
+
+            #Nulls are written as blank cells
+            df_rows = df_rows.astype(object).where(df_rows.notna(), None)
+            for row in df_rows.itertuples(index=False, name=None):
+                ws.write_row(irow, 0, row)
+                irow += 1
+    wb.close()
+
+def ListReplaceNaN(lst, val_replace):
+    for i, v in enumerate(lst):
+        if IsNullVal(v): lst[i] = val_replace
+    return lst
+
+def CI_BuildMetadataList(ColInfo, lstCols, CI_MetadataDict, IsFillColName):
+    """Build a matching Column Info metadata list from a list of Column Info variables (suitable for zip
+        iteration over the two lists)
+
+    Args:
+        ColInfo (Dict): Column Info dictionary of metadata property dictionaries (Units, Import Names etc.)
+        lstCols (String List): list of Column Info variable names
+        CI_MetadataDict (String Dict name): Column Info metadata sub-dictionary name
+        IsFillColName (Boolean): TRUE toggles substituting lstCols value into lstResult in place of None.
+                                 Useful if trying to populate a list of either substitute or default names
+
+    Raises:
+        iStatus = 1 if any of lstCols not found in ColInfo
+
+    Returns:
+        lstResult (String List): list of metadata values matching lst_dfCols
+        iStatus (Integer): Error Status
+    """
+    iStatus = 0 #Normal exit
+    lstResult = []
+    for col in lstCols:
+        if not col in ColInfo[CI_MetadataDict]:
+            iStatus = 1
+            continue
+        if IsNullVal(ColInfo[CI_MetadataDict][col]) and IsFillColName:
+            lstResult.append(col)
+        else:
+            lstResult.append(ColInfo[CI_MetadataDict][col])
+    return lstResult, iStatus
+
+
+def CI_RenameColsFromImport(ColInfo, df):
+    """Rename DataFrame columns to ColInfo default variable names (typically starting from name_import Names
+        used in raw data)
+
+    Args:
+        ColInfo (Dict): Column Info dictionary of metadata property dictionaries (Units, Import Names etc.)
+        df (DataFrame): DataFrame of raw data for column renaming
+
+    Returns:
+        df (DataFrame) with ColInfo import column names renamed to default column names
+    """
+    if not isinstance(ColInfo, ColInfoDict): ColInfo = ColInfoDict(ColInfo)
+    di = {col: ColInfo.import_to_name[col] for col in df.columns if col in ColInfo.import_to_name}
+    if len(di) > 0: df.rename(columns=di, inplace=True)
+    return df
+
+def CI_RenameColsForExport(ColInfo, df):
+    """Renames columns from default names to ColInfo export names
+
+    Args:
+        ColInfo (Dict): Column Info dictionary of metadata property dictionaries (Units, Import Names etc.)
+        df (DataFrame): DataFrame of raw data for column renaming
+
+    Returns:
+        df (DataFrame) with default column names renamed to ColInfo export names
+    """
+
+    if not isinstance(ColInfo, ColInfoDict): ColInfo = ColInfoDict(ColInfo)
+    di = {col: ColInfo.name_to_export[col] for col in df.columns if col in ColInfo.name_to_export}
+    if len(di) > 0: df.rename(columns=di, inplace=True)
+    return df
+
+def FindCIName(ColInfo, CI_AltNameDict, col):
+    """Find default ColInfo variable name from a variable's name_import or other name metadata property
+
+    Args:
+        ColInfo (Dict): Column Info dictionary of metadata property dictionaries (Units, Import Names etc.).
+        NewNameCIDict (String: ColInfo Dict name): Metadata dictionary name in ColInfo (e.g. 'name_export')
+        col (String): Default variable name in ColInfo
+
+    Returns:
+        df (DataFrame) with import names replaced by default variable (column) names
+    """
+    if (CI_AltNameDict == Name_iCI) and isinstance(ColInfo, ColInfoDict): return ColInfo.import_to_name.get(col, np.nan)
+    for k, v in ColInfo[CI_AltNameDict].items():
+        if v == col: return k
+    return np.nan
+
+def IsNullVal(val):
+    """Return TRUE if val is null"""
+    if isinstance(val,float) and math.isnan(val): return True
+    return False
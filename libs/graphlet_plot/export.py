@@ -0,0 +1,247 @@
+import os
+import json
+import pickle
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import matplotlib
+
+#Import JDL utility modules
+from . import plot as graphlet_plot
+from . import util
+
+#graphlet_plot/export.py - save a finished figure to several formats and resolutions concurrently,
+#page its time windows into a multipage PDF, or write its prepared data as a bundle for client-side drawing
+
+#Default output formats of ExportFigure
+ExportFormats = ('png', 'svg', 'pdf')
+
+def ExportFigure(fig, out_dir, name, formats=ExportFormats, dpis=None, executor=None):
+    """
+    Save a finished figure (e.g. after FormatTimeSeriesGraphletPlot) to each format and dpi in a process pool
+
+    The figure is pickled once, before this returns, so the caller may go on to change
+    or close it (or build the next plot) while workers unpickle their own copy and draw
+    it. Each output is written to a temporary file in out_dir and moved into place with
+    os.replace, so readers never see a partial file. Files are named name.fmt, or
+    name_<dpi>dpi.fmt when several dpis are given
+
+    Args:
+    fig (Matplotlib Figure) - figure to save (pyplot or standalone Figure)
+    out_dir (String) - directory path for the output files (created if needed)
+    name (String) - base name of the output files
+    formats (list of strings) - output formats such as 'png', 'svg' and 'pdf'
+    dpis (list of integers) - output resolutions; default is the figure's dpi
+    executor - optional concurrent.futures executor to reuse across figures; default
+               is a module-level process pool started on first use
+
+    Returns:
+    Dictionary of concurrent.futures Future by output path; each future's result is its path
+    """
+    if dpis is None: dpis = [fig.dpi]
+    if executor is None: executor = DefaultExecutor()
+    os.makedirs(out_dir, exist_ok=True)
+    fig_bytes = pickle.dumps(fig)
+    dict_futures = {}
+    for dpi in dpis:
+        for fmt in formats:
+            fname = name + ('_' + str(int(dpi)) + 'dpi' if len(dpis) > 1 else '') + '.' + fmt
+            fpath = os.path.join(out_dir, fname)
+            dict_futures[fpath] = executor.submit(SaveFigureJob, fig_bytes, fpath, fmt, dpi)
+    return dict_futures
+
+def SaveFigureJob(fig_bytes, fpath, fmt, dpi):
+    """
+    Worker job: unpickle a figure, save it to a temporary file and atomically replace fpath; return fpath
+
+    A figure pickled from pyplot is registered with the worker's pyplot when unpickled,
+    so it is closed afterwards (long-lived workers would otherwise keep every figure)
+    """
+    matplotlib.use('Agg')
+    fig = pickle.loads(fig_bytes)
+    fpath_tmp = fpath + '.tmp'
+    try:
+        fig.savefig(fpath_tmp, format=fmt, dpi=dpi)
+        os.replace(fpath_tmp, fpath)
+    finally:
+        if os.path.exists(fpath_tmp): os.remove(fpath_tmp)
+        if fig.canvas.manager is not None:
+            import matplotlib.pyplot as plt
+            plt.close(fig)
+    return fpath
+
+#Process pool shared by ExportFigure calls without their own executor (started by DefaultExecutor)
+ExportExecutor = None
+
+def DefaultExecutor(n_workers=None):
+    """Return the module's export process pool, starting it with n_workers (default CPU count) on first use"""
+    global ExportExecutor
+    if ExportExecutor is None:
+        ExportExecutor = ProcessPoolExecutor(max_workers=n_workers or os.cpu_count() or 1)
+    return ExportExecutor
+
+def ShutdownExecutor(wait=True):
+    """Shut down the module's export process pool (waiting for pending outputs unless wait is False)"""
+    global ExportExecutor
+    if ExportExecutor is not None: ExportExecutor.shutdown(wait=wait)
+    ExportExecutor = None
+
+def ExportPages(gp, fpath, lst_windows, x_strftime_format=None):
+    """
+    Write one PDF page per time window of a rendered GraphletPlot
+
+    The plot's figure, axes, collections and labels are built once (by Render); each
+    page only swaps in its window's points with GraphletPlot.SetWindow and redraws, so
+    per-page cost follows the visible data rather than the whole history
+
+    Args:
+    gp (GraphletPlot) - rendered graphlet plot
+    fpath (String or file-like object) - output PDF
+    lst_windows (list of tuples) - (start, end) datetime window of each page (see PageWindows)
+    x_strftime_format [string] - optional date format for the pages' x tick labels
+
+    Returns:
+    fpath
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+    fig = gp.axes.figure
+    with PdfPages(fpath) as pdf:
+        for t_range in lst_windows:
+            gp.SetWindow(t_range, x_strftime_format)
+            with util.Stage('ExportPages.page'):
+                pdf.savefig(fig)
+    return fpath
+
+def PageWindows(t_range, freq='1D'):
+    """
+    Split t_range into consecutive page windows of a Pandas frequency ('1D', '7D', 'W', '6h'...)
+
+    Page starts are aligned at midnight (rolled back to the frequency's anchor, such as
+    Sunday for 'W') before t_range's start; the last page may end after t_range's end.
+    A zero-length t_range gets the one page containing it; a reversed one gets none
+
+    Returns:
+    list of (start, end) Timestamp tuples
+    """
+    offset = pd.tseries.frequencies.to_offset(freq)
+    t_start, t_end = pd.Timestamp(t_range[0]), pd.Timestamp(t_range[1])
+    starts = pd.date_range(offset.rollback(t_start.normalize()), t_end, freq=offset)
+    return [(start, start + offset) for start in starts
+            if (start + offset > t_start) and ((start < t_end) or (start <= t_start))]
+
+def RenderGraphletPages(config, df, fpath, freq='1D', t_range=None, x_strftime_format=None):
+    """
+    Build config's graphlets once and write a multipage PDF with one page per freq window of t_range
+
+    Args:
+    config (Dict) - graphlet plot configuration (see graphlet_plot.BuildGraphletsFromConfig)
+    df (Pandas DataFrame) - data for the plot
+    fpath (String or file-like object) - output PDF
+    freq (String) - Pandas frequency of the pages such as '1D' or 'W'
+    t_range [tuple - datetime format] - optional range to page through; default is the x-data range
+    x_strftime_format [string] - optional date format for the pages' x tick labels
+
+    Returns:
+    fpath
+    """
+    from matplotlib.figure import Figure
+    lst, t_range = graphlet_plot.BuildGraphletsFromConfig(config, df, t_range)
+    lst_windows = PageWindows(t_range, freq)
+    if len(lst_windows) == 0: raise ValueError('No pages: t_range end ' + str(t_range[1]) + ' is before its start')
+    for g in lst: g.SetWindow(lst_windows[0])
+    plot = config.get('plot', {})
+    fig = Figure(figsize=plot.get('figsize', (12,8)), dpi=plot.get('dpi', 100))
+    axes = fig.subplots(nrows=1, ncols=1)
+    axes.tick_params(axis='x', labelrotation=45)
+    gp = graphlet_plot.GraphletPlot(lst, lst_windows[0], config['spacing'])
+    gp.Render(axes, plot.get('title', ''), plot.get('x_strftime_format', '%b-%-d-%Y'), plot.get('sizes', (12,14,24)))
+    return ExportPages(gp, fpath, lst_windows, x_strftime_format)
+
+#Bundle file names and byte alignment of each array in the data file
+BundleData = 'data.bin'
+BundleManifest = 'manifest.json'
+BundleAlign = 64
+
+def ExportBundle(gp, dir_bundle, lst_windows=None):
+    """
+    Write a graphlet stack's plot-ready data as a bundle that a client can draw without server rendering
+
+    The bundle is one raw binary data file of little-endian arrays, each starting at a
+    multiple of BundleAlign bytes, plus manifest.json. The manifest has the plot's
+    y_range, ticks and labels, each graphlet's drawing attributes (heading and its y
+    position, horizontal line position, ticks, labels, dot color, size and
+    transparency) and, per chunk, its x_range (headings sit at its start) and the
+    offset, byte count, dtype and length of each graphlet's x and y arrays. x are
+    Matplotlib date units (days since 1970-01-01) as float64 and y are mapped/rescaled
+    y-values as float32, i.e. the points Render draws (decimated/pyramid envelopes
+    included). The data file can be memory-mapped or served by byte range, so a
+    client fetches only the chunks it shows
+
+    Args:
+    gp (GraphletPlot) - graphlet plot (rendering is not needed)
+    dir_bundle (String) - output folder (created if needed)
+    lst_windows (list of tuples) - optional (start, end) datetime windows, one chunk
+                                   each (see PageWindows); default is one chunk of gp.t_range
+
+    Returns:
+    manifest dictionary
+    """
+    import matplotlib.colors as mcolors
+    os.makedirs(dir_bundle, exist_ok=True)
+    if lst_windows is None: lst_windows = [gp.t_range]
+    manifest = {'format': 'graphlet-bundle', 'version': 1, 'data': BundleData, 'x_units': 'days since 1970-01-01',
+                'y_range': [float(v) for v in gp.y_range], 'ticks': [float(v) for v in gp.ticks],
+                'labels': [str(v) for v in gp.labels], 'graphlets': [], 'chunks': []}
+    for g in gp.graphlets:
+        manifest['graphlets'].append({'name': None if g.name is None else str(g.name), 'type': type(g).__name__,
+            'heading': g.heading, 'heading_y': float(g.heading_coords[1]),
+            'ypos_hline': None if g.ypos_hline is None else float(g.ypos_hline),
+            'ymin': float(g.ymin), 'ymax': float(g.ymax), 'ticks': [float(v) for v in getattr(g, 'ticklist', [])],
+            'labels': [str(v) for v in getattr(g, 'labels', [])], 'color': mcolors.to_hex(getattr(g, 'dotcolor', 'C0')),
+            'size': float(getattr(g, 'dotsize', 36)), 'alpha': float(getattr(g, 'dot_transparency', 1.0)),
+            'IsDensity': bool(getattr(g, 'IsDensity', False)), 'IsSpans': bool(getattr(g, 'IsSpans', False))})
+
+    t_range_orig, offset = gp.t_range, 0
+    fpath_data = os.path.join(dir_bundle, BundleData)
+    with util.Stage('ExportBundle'), open(fpath_data + '.tmp', 'wb') as f:
+        try:
+            for t_range in lst_windows:
+                for g in gp.graphlets: g.SetWindow(t_range)
+                lst_x, lst_y = gp.StackArrays()
+
+                #tz-aware limits convert to UTC datetime64, the instants tz-aware x-data are stored at
+                lims = np.array([pd.Timestamp(t).to_datetime64() for t in t_range], dtype='datetime64[ns]')
+                chunk = {'x_range': [float(v) for v in graphlet_plot.XPlotUnits(lims)], 'graphlets': []}
+                for x, y in zip(lst_x, lst_y):
+                    entries = {}
+                    for key, arr in [('x', np.asarray(x, dtype='<f8')), ('y', np.asarray(y, dtype='<f4'))]:
+                        f.write(bytes(-offset % BundleAlign))
+                        offset += -offset % BundleAlign
+                        entries[key] = {'offset': offset, 'nbytes': arr.nbytes, 'dtype': arr.dtype.str,
+                                        'length': len(arr)}
+                        f.write(np.ascontiguousarray(arr).tobytes())
+                        offset += arr.nbytes
+                    chunk['graphlets'].append(entries)
+                manifest['chunks'].append(chunk)
+        finally:
+            for g in gp.graphlets: g.SetWindow(t_range_orig)
+
+    #Replace data before manifest so the manifest never describes a missing or partial data file
+    os.replace(fpath_data + '.tmp', fpath_data)
+    fpath_manifest = os.path.join(dir_bundle, BundleManifest)
+    with open(fpath_manifest + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(fpath_manifest + '.tmp', fpath_manifest)
+    return manifest
+
+def ReadBundle(dir_bundle):
+    """Return a bundle's manifest and its data file memory-mapped as bytes (see BundleArray)"""
+    with open(os.path.join(dir_bundle, BundleManifest)) as f:
+        manifest = json.load(f)
+    fpath_data = os.path.join(dir_bundle, manifest['data'])
+    data = np.memmap(fpath_data, dtype='uint8', mode='r') if os.path.getsize(fpath_data) > 0 else np.zeros(0, dtype='uint8')
+    return manifest, data
+
+def BundleArray(data, entry):
+    """Return the array described by a manifest entry (offset, nbytes, dtype) as a view of a bundle's data"""
+    return data[entry['offset']:entry['offset'] + entry['nbytes']].view(entry['dtype'])
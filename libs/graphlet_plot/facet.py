@@ -0,0 +1,99 @@
+import os
+import re
+import hashlib
+import numpy as np
+from matplotlib.figure import Figure
+
+#Import JDL utility modules
+from . import pd_util
+from . import plot as graphlet_plot
+from . import util
+
+#graphlet_plot/facet.py - render the same graphlet layout for each entity of a long-format DataFrame
+
+def FacetSlices(df, entity_col):
+    """
+    Partition a long DataFrame by entity in one pass
+
+    The entity column is factorized (sorted entity order) and, unless rows are already
+    grouped by entity, the frame is reordered once with a stable sort so each entity's
+    rows keep their order. Entities are then contiguous, zero-copy row slices located
+    by offsets into the sorted codes (nulls in entity_col are dropped)
+
+    Args:
+    df (Pandas DataFrame) - long-format data with one row per entity and time
+    entity_col (String) - column identifying the entity (machine, consumer...)
+
+    Returns:
+    list of (entity, DataFrame slice) tuples in sorted entity order
+    """
+    with util.Stage('FacetSlices', len(df)):
+        codes, lst_entities = pd_util.FactorizeSer(df[entity_col])
+        pos = pd_util.SortPositions(codes)
+        if pos is not None:
+            df, codes = df.take(pos), codes[pos]
+        bounds = np.searchsorted(codes, np.arange(len(lst_entities) + 1), side='left')
+    return [(entity, df.iloc[bounds[i]:bounds[i+1]]) for i, entity in enumerate(lst_entities)]
+
+def RenderFacetFiles(config, df, entity_col, out_dir, fmt='png', t_range=None):
+    """
+    Render config's graphlet layout for each entity to its own file in out_dir
+
+    Files are named by entity (see FacetFileName; entities whose names would collide get
+    a short hash suffix). t_range defaults to each entity's own data range
+
+    Returns:
+    Dictionary of output path by entity
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    dict_paths, used = {}, set()
+    for entity, df_entity in FacetSlices(df, entity_col):
+        fpath = os.path.join(out_dir, FacetFileName(entity, used) + '.' + fmt)
+        dict_paths[entity] = graphlet_plot.RenderGraphletFigure(config, df_entity, fpath, t_range)
+    return dict_paths
+
+def RenderFacetGrid(config, df, entity_col, fpath, ncols=2, t_range=None):
+    """
+    Render config's graphlet layout for each entity on one grid figure saved to fpath
+
+    Each entity gets a subplot titled with its name; config['plot'] figsize is the size
+    of one subplot. t_range defaults to each entity's own data range
+
+    Returns:
+    fpath
+    """
+    lst_facets = FacetSlices(df, entity_col)
+    plot = config.get('plot', {})
+    nrows = max(-(-len(lst_facets) // ncols), 1)
+    figsize = plot.get('figsize', (12,8))
+    fig = Figure(figsize=(figsize[0] * ncols, figsize[1] * nrows), dpi=plot.get('dpi', 100))
+    lst_axes = fig.subplots(nrows=nrows, ncols=ncols, squeeze=False).ravel()
+    for (entity, df_entity), axes in zip(lst_facets, lst_axes):
+        lst, t_range_entity = graphlet_plot.BuildGraphletsFromConfig(config, df_entity, t_range)
+        axes.tick_params(axis='x', labelrotation=45)
+        graphlet_plot.GraphletPlot(lst, t_range_entity, config['spacing']).Render(axes, str(entity),
+                                                          plot.get('x_strftime_format', '%b-%-d-%Y'),
+                                                          plot.get('sizes', (12,14,24)))
+    for axes in lst_axes[len(lst_facets):]:
+        axes.set_axis_off()
+    fig.tight_layout()
+    with util.Stage('RenderFacetGrid.savefig'):
+        fig.savefig(fpath, dpi=plot.get('dpi', 100))
+    return fpath
+
+def FacetFileName(entity, used=None):
+    """
+    Return file name (without extension) for an entity
+
+    Characters other than letters, digits, '-', '_' and '.' are replaced with '_'. If that
+    changes the name, or the name is in the optional set used (compared ignoring case, as
+    file systems may), a short hash of the entity is appended; used is updated with the
+    returned name. Raises ValueError if the name still collides
+    """
+    name = re.sub(r'[^A-Za-z0-9._-]', '_', str(entity))
+    if (name != str(entity)) or ((used is not None) and (name.casefold() in used)):
+        name += '_' + hashlib.md5(repr(entity).encode()).hexdigest()[:8]
+    if used is not None:
+        if name.casefold() in used: raise ValueError('Facet file name collision for entity ' + repr(entity))
+        used.add(name.casefold())
+    return name
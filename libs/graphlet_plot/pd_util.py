@@ -0,0 +1,532 @@
+#Version 8/7/20
+
+import pandas as pd
+import numpy as np
+import os
+import hashlib
+
+#JDL utility module colinfo is imported by the functions that use it
+PathColInfo = 'libs/colinfo.csv'
+
+def SubsetToFilter(df, fil):
+    return df[fil]
+
+#Add a row order column to fingerprint rows (move this to tbltools library)
+def AddRowOrderCol(df, col_name):
+    df.reset_index(inplace=True,drop=True)
+    df.index.name = col_name
+    df.reset_index(drop=False, inplace=True)
+    return df
+
+def ImportDataFrame(tbl_cls, file, chunksize=None, dir_cache=None):
+    """
+    Import a DataFrame from csv. Rename columns to ColInfo Names. Filter to keepcols
+
+    Only keepcols are parsed (their ColInfo import names are passed to read_csv as
+    usecols; empty keepcols imports all columns). Columns with a ColInfo dtype are parsed
+    as that dtype ('datetime' parses dates). Optionally reads the file in chunks (with the
+    same resulting dtypes) and caches the imported DataFrame as Parquet (requires pyarrow)
+    keyed on the csv file's path and modification time, the ColInfo file's modification
+    time, keepcols and whether it was read in chunks
+
+    Args:
+    tbl_cls (Class instance) - table class with keepcols list of ColInfo names
+    file (String) - path to csv file
+    chunksize (Integer) - optional number of rows per chunk for chunked reading
+    dir_cache (String) - optional directory for Parquet cache files
+
+    JDL 7/21/20
+    """
+    from . import colinfo
+    fpath_cache = None
+    if dir_cache is not None:
+        fpath_cache = ImportCachePath(file, tbl_cls.keepcols, dir_cache, chunksize is not None)
+        if os.path.isfile(fpath_cache): return pd.read_parquet(fpath_cache)
+
+    ColInfo = colinfo.ReadColInfoFromFile(PathColInfo)
+    cols_file = list(pd.read_csv(file, nrows=0).columns) if len(tbl_cls.keepcols) == 0 else None
+    usecols, dtypes, parse_dates = ImportColSpecs(ColInfo, tbl_cls.keepcols, cols_file)
+    if chunksize is None:
+        df = pd.read_csv(file, usecols=usecols, dtype=dtypes, parse_dates=parse_dates)
+    else:
+
+        #Category columns are read as strings (the values read_csv categorizes) and
+        #categorized after combining chunks so chunk categories can't conflict
+        dtypes_chunk = {k: ('str' if v == 'category' else v) for k, v in dtypes.items()}
+        reader = pd.read_csv(file, usecols=usecols, dtype=dtypes_chunk, parse_dates=parse_dates, chunksize=chunksize)
+        df = pd.concat(reader, ignore_index=True)
+        for col in dtypes:
+            if dtypes[col] == 'category': df[col] = df[col].astype('category')
+
+    colinfo.CI_RenameColsFromImport(ColInfo, df)
+    if len(tbl_cls.keepcols) > 0: df = df[tbl_cls.keepcols]
+    if fpath_cache is not None: WriteImportCache(df, fpath_cache)
+    return df
+
+def ImportColSpecs(ColInfo, keepcols, cols_file=None):
+    """
+    Translate ColInfo names to read_csv usecols, dtype and parse_dates arguments
+
+    Args:
+    ColInfo (Dict) - Column Info dictionary of metadata property dictionaries
+    keepcols (list) - ColInfo names of columns to import; empty list imports all
+    cols_file (list) - optional column names of the file; with empty keepcols, dtypes
+                       are set for the ColInfo variables whose import names are among them
+
+    Returns:
+    usecols (list of import names or None), dtypes (Dict by import name),
+    parse_dates (list of import names)
+    """
+    from . import colinfo
+    usecols, dtypes, parse_dates = None, {}, []
+    lst_cols = keepcols
+    if len(keepcols) > 0:
+        usecols = []
+    elif cols_file is not None:
+        lst_cols = list(ColInfo[colinfo.Name_iCI])
+    for col in lst_cols:
+        name_import = ColInfo[colinfo.Name_iCI].get(col, col)
+        if colinfo.IsNullVal(name_import) or (len(name_import) == 0): name_import = col
+        if usecols is not None:
+            usecols.append(name_import)
+        elif not name_import in cols_file:
+            continue
+
+        #Flag (category/int8), datetime etc. dtypes from optional ColInfo dtype metadata
+        dtype = ColInfo.get(colinfo.DtypeCI, {}).get(col, '')
+        if colinfo.IsNullVal(dtype) or (len(dtype) == 0): continue
+        if dtype == 'datetime':
+            parse_dates.append(name_import)
+        else:
+            dtypes[name_import] = dtype
+    return usecols, dtypes, parse_dates
+
+def ImportCachePath(file, keepcols, dir_cache, IsChunked=False):
+    """
+    Return Parquet cache path for a csv file
+
+    The file name is <csv name>.<source key>.<version>.parquet. The source key hashes the
+    csv file's absolute path, keepcols and read mode (chunked or not), giving one cache
+    entry per source; the version is the modification times of the csv and ColInfo files
+    """
+    source = hashlib.md5(os.path.abspath(file).encode()).hexdigest()[:8] + '_' + \
+             hashlib.md5(repr((list(keepcols), IsChunked)).encode()).hexdigest()[:8]
+    version = str(os.stat(file).st_mtime_ns) + '_' + str(os.stat(PathColInfo).st_mtime_ns)
+    return os.path.join(dir_cache, '.'.join([os.path.basename(file), source, version, 'parquet']))
+
+def WriteImportCache(df, fpath_cache):
+    """
+    Write an imported DataFrame to the Parquet cache and remove stale versions of the same
+    source (csv path, keepcols and read mode; see ImportCachePath). Caching is skipped if no Parquet
+    engine is installed
+    """
+    dir_cache, fname = os.path.split(fpath_cache)
+    prefix = fname[:fname.rindex('.', 0, fname.rindex('.parquet')) + 1]
+    os.makedirs(dir_cache, exist_ok=True)
+    try:
+        df.to_parquet(fpath_cache + '.tmp')
+    except ImportError:
+        return
+    os.replace(fpath_cache + '.tmp', fpath_cache)
+    for f in os.listdir(dir_cache):
+        if f.startswith(prefix) and f.endswith('.parquet') and (f != fname):
+            os.remove(os.path.join(dir_cache, f))
+
+#Largest combined group key of TopItemsCtAndDesc before its running keys are renumbered
+KeyLimit = 2**62
+
+def TopItemCtAndDesc(df, lst_by):
+    """
+    Group a Dataframe by a list of "by" columns and return top item's lst_by value(s) and count
+
+    Returns:
+    desc:   lst_by value(s) for top-ranked row.  data type will be value or tuple depending
+            on whether lst_by is single item or multi-item list
+    ct:     count of top-ranked row in groupby
+
+    JDL 7/27/20
+    """
+    return TopItemsCtAndDesc(df, [lst_by])[0]
+
+def TopItemsCtAndDesc(df, lst_groupings, k=1, dict_codes=None):
+    """
+    Return top item(s) and count(s) of several groupings of a DataFrame in one pass each
+
+    Each column is factorized once and its codes are shared by all groupings (and, via
+    dict_codes, by later calls on the same unmodified DataFrame). A grouping's codes are
+    combined into one integer key per row, counted with bincount and the top k keys are
+    selected with a partition instead of sorting all groups. Rows with a null in any
+    grouping column are not counted. Ties rank in sorted order of the grouping values
+
+    Args:
+    df (Pandas DataFrame) - data to summarize
+    lst_groupings (list) - groupings, each a column name or list of column names (lst_by)
+    k (Integer) - number of top items per grouping
+    dict_codes (Dict) - optional cache of (codes, categories) by column name to reuse
+
+    Returns:
+    list aligned with lst_groupings. With k=1, each item is (desc, ct) as returned by
+    TopItemCtAndDesc ('None', 0 if no groups); otherwise a list of up to k (desc, ct)
+    tuples in descending count order
+    """
+    if dict_codes is None: dict_codes = {}
+    lst_results = []
+    for lst_by in lst_groupings:
+        IsSingle = not isinstance(lst_by, (list, tuple)) or (len(lst_by) == 1)
+        if not isinstance(lst_by, (list, tuple)): lst_by = [lst_by]
+        for col in lst_by:
+            if not col in dict_codes: dict_codes[col] = FactorizeSer(df[col])
+        sizes = [max(len(dict_codes[col][1]), 1) for col in lst_by]
+
+        #Combine the grouping's codes into mixed-radix keys (sorted key order = sorted group order).
+        #If the next column would overflow int64 keys, the running keys are first renumbered
+        #densely in sorted order (at most one number per row)
+        keys = np.zeros(len(df), dtype='int64')
+        valid = np.ones(len(df), dtype=bool)
+        radix = 1
+        for col, size in zip(lst_by, sizes):
+            codes = dict_codes[col][0]
+            if radix * size > KeyLimit:
+                keys = pd.factorize(keys, sort=True)[0].astype('int64')
+                radix = int(keys.max()) + 1 if len(keys) > 0 else 1
+            keys = keys * size + codes
+            radix *= size
+            valid &= codes >= 0
+        rows = np.flatnonzero(valid)
+        keys = keys[rows]
+
+        #Count keys directly, or compact them first if the key space is much larger than the data
+        if radix > 4 * len(keys) + 1024:
+            keys = pd.factorize(keys, sort=True)[0]
+        counts = np.bincount(keys)
+        ntop = min(k, np.count_nonzero(counts))
+        top = np.array([], dtype='int64')
+        if ntop > 0:
+            #Keep every key tied with the k-th count so ties rank in key (sorted group) order
+            kth = -np.partition(-counts, ntop - 1)[ntop - 1]
+            top = np.flatnonzero(counts >= kth)
+            top = top[np.lexsort((top, -counts[top]))][:ntop]
+
+        #Decode each top key from the codes of its first row
+        lst_top = []
+        for key in top:
+            ct = int(counts[key])
+            row = rows[np.argmax(keys == key)]
+            desc = tuple(dict_codes[col][1][dict_codes[col][0][row]] for col in lst_by)
+            if IsSingle: desc = desc[0]
+            lst_top.append((desc, ct))
+        if k == 1:
+            lst_results.append(lst_top[0] if len(lst_top) > 0 else ('None', 0))
+        else:
+            lst_results.append(lst_top)
+    return lst_results
+
+def MapSerToAltVals(ser_data, lst_data_keys, lst_data_vals):
+    """Map a list of values to an alternate list for plotting
+
+    Useful for "rescaling" or mapping text categories to numerical values for plotting.
+    Factorizes ser_data and maps its (few) unique values through a lookup array rather
+    than replacing values row by row. Values not in lst_data_keys are left unchanged
+
+    Args:
+    ser_data (Pandas Series) - data series with values for remapping
+    lst_data_keys (list) - list of keys (current series values) for mapping
+    lst_data_vals (list) - list of values to map to
+
+    Raises:
+    No error trapping currently
+
+    Returns:
+    Pandas series with keys remapped to values
+
+    """
+    di = dict(zip(lst_data_keys, lst_data_vals))
+    if len(di) == 0: return ser_data.copy()
+
+    #Locate each unique series value in the keys; unmatched uniques map to themselves
+    codes, uniques = pd.factorize(ser_data, use_na_sentinel=False)
+    pos = pd.Index(list(di.keys())).get_indexer(uniques)
+    vals = np.array(list(di.values()) + [None], dtype=object)
+    lookup = np.where(pos >= 0, vals[pos], np.asarray(uniques, dtype=object))
+    lookup = pd.Series(lookup, dtype=object).infer_objects().to_numpy()
+    return pd.Series(lookup[codes], index=ser_data.index, name=ser_data.name)
+
+def FactorizeSer(ser_data, IsSort=True):
+    """
+    Factorize a Series into integer codes and a list of its unique, non-null values
+
+    Codes are positions in the returned category list and are -1 for nulls. With
+    IsSort, categories are in sorted order (or order of first appearance if the
+    values can't be sorted against each other) so category order repeats between runs
+
+    Args:
+    ser_data (Pandas Series) - data series to factorize
+    IsSort (Boolean) - toggles sorting the categories
+
+    Returns:
+    codes (numpy integer array) - category position for each ser_data value
+    lst_cats (list) - unique, non-null ser_data values
+    """
+    try:
+        codes, uniques = pd.factorize(ser_data, sort=IsSort)
+    except TypeError:
+        codes, uniques = pd.factorize(ser_data, sort=False)
+    return codes, list(uniques)
+
+def MapCodesToVals(codes, lst_vals):
+    """
+    Map factorized codes to numeric values with a NumPy lookup array
+
+    Args:
+    codes (numpy integer array) - codes such as from FactorizeSer; -1 for nulls
+    lst_vals (list; numeric values) - value for each code (e.g. a ticklist)
+
+    Returns:
+    numpy float array of mapped values (NaN where code is -1)
+    """
+    lookup = np.append(np.asarray(lst_vals, dtype='float64'), np.nan)
+    return lookup[codes]
+
+def CodesDtype(ncats):
+    """Return the smallest signed integer dtype holding codes 0 to ncats - 1 and -1 for nulls"""
+    for dtype in ['int8', 'int16', 'int32']:
+        if ncats <= np.iinfo(dtype).max: return np.dtype(dtype)
+    return np.dtype('int64')
+
+def SortPositions(vals):
+    """
+    Return positions that stably sort vals (e.g. datetime x-data) or None if already sorted
+
+    Nulls (NaT/NaN) sort to the end
+    """
+    vals = np.asarray(vals)
+    if (vals.size < 2) or bool(np.all(vals[1:] >= vals[:-1])): return None
+    return np.argsort(vals, kind='stable')
+
+def WindowPositions(vals, val_range):
+    """
+    Return (start, stop) slice positions of sorted vals within val_range by binary search
+
+    Args:
+    vals (numpy array) - sorted numeric or datetime64 values
+    val_range (tuple) - (lower, upper) inclusive limits; datetime-like limits are converted
+                        to datetime64 for datetime64 vals. Either limit may be None (open)
+
+    Returns:
+    tuple of integers - vals[start:stop] are the values within val_range
+    """
+    lst_lims = []
+    for lim in val_range:
+        if (lim is not None) and np.issubdtype(vals.dtype, np.datetime64): lim = pd.Timestamp(lim).to_datetime64()
+        lst_lims.append(lim)
+    start = 0 if lst_lims[0] is None else int(np.searchsorted(vals, lst_lims[0], side='left'))
+    stop = len(vals) if lst_lims[1] is None else int(np.searchsorted(vals, lst_lims[1], side='right'))
+    return start, max(start, stop)
+
+def RunLengthSpans(codes, x, max_gap=None):
+    """
+    Run-length encode state codes sampled at sorted x into (start, end) spans
+
+    A run is a block of consecutive samples with the same code. With state semantics,
+    a run's span lasts from its first sample to the next sample after it (the final
+    run ends at its last sample). With max_gap, runs also break where successive
+    samples are more than max_gap apart, and a run ending at such a gap ends at its
+    last sample. Runs of null code (-1) are dropped. Vectorized with diff/nonzero
+
+    Args:
+    codes (numpy integer array) - state codes such as from FactorizeSer; -1 for nulls
+    x (numpy float array) - sorted sample positions (e.g. Matplotlib date units)
+    max_gap (numeric) - optional maximum x distance bridged by a run
+
+    Returns:
+    run_codes (numpy integer array) - code of each span
+    x_start, x_end (numpy float arrays) - start and end of each span
+    """
+    codes, x = np.asarray(codes), np.asarray(x, dtype='float64')
+    n = len(codes)
+    if n == 0: return codes[:0], x[:0], x[:0]
+    IsBreak = np.empty(n, dtype=bool)
+    IsBreak[0] = True
+    IsBreak[1:] = codes[1:] != codes[:-1]
+    IsGap = np.zeros(n + 1, dtype=bool)
+    if max_gap is not None: IsGap[1:n] = np.diff(x) > max_gap
+    starts = np.flatnonzero(IsBreak | IsGap[:n])
+    stops = np.append(starts[1:], n)
+
+    #Span ends at the next sample unless the run is last or followed by a gap
+    x_end = x[stops - 1]
+    IsNext = (stops < n) & ~IsGap[stops]
+    x_end[IsNext] = x[stops[IsNext]]
+    keep = codes[starts] >= 0
+    return codes[starts][keep], x[starts][keep], x_end[keep]
+
+def DensityGrid(x, y, x_range, y_range, shape):
+    """
+    Count x-y points in a grid of equal-size bins spanning x_range and y_range
+
+    Bin indices are computed arithmetically and counted with one bincount (no per-bin
+    loop or search). Points outside the ranges and null points are not counted
+
+    Args:
+    x, y (numpy float arrays) - point coordinates
+    x_range, y_range (tuples; numeric) - (lower, upper) extent of the grid
+    shape (tuple; integers) - (number of y bins, number of x bins), e.g. pixel rows and columns
+
+    Returns:
+    numpy integer array of counts with the given shape; row 0 is the lowest y bin
+    """
+    ny, nx = shape
+    x, y = np.asarray(x, dtype='float64'), np.asarray(y, dtype='float64')
+    valid = (x >= x_range[0]) & (x <= x_range[1]) & (y >= y_range[0]) & (y <= y_range[1])
+    ix = ((x[valid] - x_range[0]) * (nx / (x_range[1] - x_range[0]))).astype('int64')
+    iy = ((y[valid] - y_range[0]) * (ny / (y_range[1] - y_range[0]))).astype('int64')
+    ix, iy = np.minimum(ix, nx - 1), np.minimum(iy, ny - 1)
+    return np.bincount(iy * nx + ix, minlength=nx * ny).reshape(ny, nx)
+
+def RescaleSerValues(ser_data, tup_lims_data, tup_lims_rescaled):
+    """
+    Rescale numeric data
+
+    Useful for "rescaling" data for plotting.  Example:
+    tup_lims_data = (0, 100)
+    tup_lims_rescaled = (-10, 0)
+    Series will be rescaled such that 0 --> -10 and 100 --> 0
+
+    Args:
+    ser_data (Pandas Series or numpy array) - data with numeric values for remapping
+    tup_lims_data (tuple; numeric values)
+    tup_lims_data (tuple; numeric values)
+
+    Raises:
+    No error trapping currently
+
+    Returns:
+    Pandas series (or numpy array) with rescaled values
+    """
+    x1_new = tup_lims_rescaled[1]
+    x0_new = tup_lims_rescaled[0]
+    x1_prev = tup_lims_data[1]
+    x0_prev = tup_lims_data[0]
+    return (ser_data - x0_prev)*((x1_new - x0_new)/(x1_prev - x0_prev)) + x0_new
+
+def RescaleValue(val, tup_lims_data, tup_lims_rescaled):
+    """
+    Rescale numeric data value
+
+    Useful for "rescaling" data for plotting.  Example:
+    tup_lims_data = (0, 100)
+    tup_lims_rescaled = (-10, 0)
+    value will be rescaled such that 0 --> -10 and 100 --> 0
+
+    Args:
+    val (Float) - value to be rescaled
+    tup_lims_data (tuple; numeric values)
+    tup_lims_data (tuple; numeric values)
+
+    Raises:
+    No error trapping currently
+
+    Returns:
+    rescaled value
+    """
+
+    x1_new = tup_lims_rescaled[1]
+    x0_new = tup_lims_rescaled[0]
+    x1_prev = tup_lims_data[1]
+    x0_prev = tup_lims_data[0]
+    return (val - x0_prev)*((x1_new - x0_new)/(x1_prev - x0_prev)) + x0_new
+
+def SeriesFromDFCols(df, valcol, indexcol, dtype=None):
+    """
+    Convert two DataFrame columns into a Series as index and values; drop nulls from valcol
+
+    args:
+    df (Pandas DataFrame) - DataFrame containing valcol and indexcol
+    valcol (String) - name of DataFrame column to return as Series values (and name of Series)
+    indexcol (String) - name of DataFrame column to return as Series index
+    dtype (Python dtype - typically int) - optional returned dtype of Series
+
+    JDL 8/6/20
+    """
+    ser = pd.Series(df[valcol].values, index=df[indexcol]).dropna()
+    ser.name = valcol
+    if not dtype is None: ser = ser.astype(dtype)
+    return ser
+
+def DecimateSerPositions(ser_x, ser_y, max_points, method='minmax'):
+    """
+    Select row positions that preserve the shape of an x-y series within a point budget
+
+    Null y-values are dropped. Series with max_points or fewer non-null values are
+    returned whole. A budget of roughly twice the plot width in pixels is visually
+    lossless for scatter-type plots
+
+    Args:
+    ser_x (Pandas Series) - x-data (numeric or datetime); used by 'lttb' method
+    ser_y (Pandas Series) - numeric y-data
+    max_points (Integer) - maximum number of positions to return
+    method (String) - 'minmax' keeps the min and max y of equal-count buckets;
+                      'lttb' uses Largest-Triangle-Three-Buckets selection
+
+    Returns:
+    numpy integer array of sorted row positions to keep
+    """
+    y = np.asarray(ser_y, dtype='float64')
+    pos_valid = np.flatnonzero(~np.isnan(y))
+    if pos_valid.size <= max_points: return pos_valid
+    if method == 'minmax':
+        sel = DecimateMinMaxPositions(y[pos_valid], max_points)
+    elif method == 'lttb':
+        x = np.asarray(ser_x)
+        if np.issubdtype(x.dtype, np.datetime64): x = x.astype('datetime64[ns]').view('int64')
+        sel = DecimateLTTBPositions(x[pos_valid].astype('float64'), y[pos_valid], max_points)
+    else:
+        raise ValueError("method must be 'minmax' or 'lttb'")
+    return pos_valid[sel]
+
+def DecimateMinMaxPositions(y, max_points):
+    """
+    Return positions of the min and max values in equal-count buckets of y (no nulls)
+
+    Uses max_points // 2 buckets, reduced with a single reshape rather than a loop
+    """
+    n = y.size
+    nbuckets = max(max_points // 2, 1)
+    size = -(-n // nbuckets)
+    offsets = np.arange(nbuckets) * size
+
+    #Pad the final bucket so the data reshape to (nbuckets, size) blocks
+    blk = np.empty(nbuckets * size)
+    blk[:n] = y
+    blk[n:] = np.inf
+    imin = blk.reshape(nbuckets, size).argmin(axis=1) + offsets
+    blk[n:] = -np.inf
+    imax = blk.reshape(nbuckets, size).argmax(axis=1) + offsets
+    sel = np.unique(np.concatenate([imin, imax]))
+    return sel[sel < n]
+
+def DecimateLTTBPositions(x, y, max_points):
+    """
+    Return positions selected by Largest-Triangle-Three-Buckets (x and y float, no nulls)
+
+    Keeps the first and last points plus, for each of max_points - 2 buckets, the point
+    forming the largest triangle with the previously kept point and the next bucket's mean
+    """
+    n = y.size
+    if max_points < 3: return np.array([0, n - 1])
+    edges = np.linspace(1, n - 1, max_points - 1).astype('int64')
+    sel = np.empty(max_points, dtype='int64')
+    sel[0], sel[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        #Average of next bucket (or the final point) is the triangle's third vertex
+        if i + 2 < len(edges):
+            xc, yc = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            xc, yc = x[n - 1], y[n - 1]
+        area = np.abs((x[a] - xc) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (yc - y[a]))
+        a = lo + area.argmax()
+        sel[i + 1] = a
+    return sel
@@ -0,0 +1,1216 @@
+#Version 8/7/20
+import weakref
+import pandas as pd
+import numpy as np
+from datetime import timedelta
+
+#Import JDL utility modules (Matplotlib is imported by the functions that draw)
+from . import pd_util
+from . import util
+
+#graphlet_plot/plot.py
+class Graphlet():
+    """
+    Set attributes common to Categorical and Continuous plots. Parent of
+    GraphletCategorical and GraphletContinuous
+
+    Data are kept as NumPy arrays in __slots__ attributes (x plus each child's
+    compact y storage), sorted by x. xdata, ydata and ydata_unscaled are Pandas
+    Series views derived from the arrays when accessed
+
+    Plotting works on a time window (t_range by default) located by binary search
+    in the sorted x-data. Mapping/rescaling to plot units happens only for the
+    window's points, when first requested by WindowArrays, and is cached until the
+    window or the data change
+
+    Graphlets whose x-data have the same identity or contents share one x array
+    (SharedXArray), which is converted to Matplotlib units once for all of them
+    (XPlotBuffer)
+
+    Appending rows that follow the existing x-data (AppendRows) writes them into
+    spare capacity after x and y (AppendArray), converts only them to plot units and
+    maps only the window's new tail, so streaming refreshes cost O(new rows)
+
+    Attributes:
+    t_range [tuple - datetime format] - the datetime range of plot data
+    ylims [tuple - either numeric or None] - (ymin, ymax) for the Graphlet
+           in y-axis units.  Specify either ymin or ymax to anchor Graphlet
+           location on y-axis of plot
+    spacing [tuple - numeric] - (spacing between categories, buffer between
+                                graphlets)
+    data [tuple - Pandas Series] (x-data, unscaled/unmapped y-data)
+    IsHLine [boolean] toggles horizontal line below the graphlet on the plot
+    heading - [string] - optional heading to label graphlet at its top left
+    dot_format [tuple - mixed types] - (string Matplotlib color, integer dot
+                size, integer dot transparency)
+    x [numpy array] - sorted x-data (datetime64 for datetime x-data; UTC for tz-aware x-data)
+    tz - time zone of tz-aware x-data (restored in xdata), else None
+    name - name of the y-data Series (name of the xdata/ydata views)
+    window [tuple - integers] - (start, stop) positions of the window's points in x
+
+    Methods:
+    UpdateLabelCoords
+    SetWindow
+    WindowArrays
+    SortByX
+    AppendRows
+    ExtendWindow
+    xdata (property)
+
+    Version: 8/6/20 JDL Data Delve LLC
+    """
+    __slots__ = ('x', 'name', 't_range', 'spacing', 'ylims', 'IsHLine', 'heading', 'dotcolor', 'dotsize',
+                 'dot_transparency', 'hline', 'heading_coords', 'ypos_hline', 'ymin', 'ymax', 'ticklist', 'labels',
+                 'window', 'window_cache', 'tz')
+
+    def __init__(self, t_range, spacing, ylims, data, IsHLine, heading=None, dot_format=None):
+        with util.Stage('Graphlet.init', len(data[0])):
+            self.x, self.tz = XDataArray(data[0])
+            self.name = getattr(data[1], 'name', None)
+            self.t_range = t_range
+            self.spacing = spacing
+            self.ylims = ylims
+            self.IsHLine = IsHLine
+            self.heading = ''
+            if not heading is None: self.heading = heading
+            if not dot_format[0] is None: self.dotcolor = dot_format[0]
+            if not dot_format[1] is None: self.dotsize = dot_format[1]
+            if not dot_format[2] is None: self.dot_transparency = dot_format[2]
+            self.hline = None
+            self.window, self.window_cache = (0, len(self.x)), None
+            Graphlet.UpdateLabelCoords(self)
+
+    @property
+    def xdata(self):
+        """x-data as a Pandas Series view of x (converted back to tz for tz-aware x-data)"""
+        if self.tz is not None: return pd.Series(self.x).dt.tz_localize('UTC').dt.tz_convert(self.tz)
+        return pd.Series(self.x, copy=False)
+
+    def SortByX(self, y_attr):
+        """Stably sort x and the y storage attribute named y_attr by x, share x, then reset the window"""
+        pos = pd_util.SortPositions(self.x)
+        if pos is not None:
+            self.x = self.x[pos]
+            setattr(self, y_attr, getattr(self, y_attr)[pos])
+        self.x = SharedXArray(self.x)
+        self.SetWindow(self.t_range)
+
+    def AppendRows(self, y_attr, new_x, new_y):
+        """
+        Append x-data and rows of the y storage attribute named y_attr, keeping x sorted
+
+        New rows are sorted among themselves; if they start at or after the last x, they
+        are written into spare capacity after x and y (AppendArray), x's plot-unit
+        conversion is extended by just the new rows and the window is extended at its
+        tail (ExtendWindow). Otherwise all rows are re-sorted with SortByX
+
+        Args:
+        y_attr [string] - name of the y storage attribute ('codes' or 'y')
+        new_x (numpy array) - x-data to append
+        new_y (numpy array) - y storage values (codes or unscaled y) to append
+        """
+        new_x = XDataArray(new_x)[0].astype(self.x.dtype, copy=False)
+        pos = pd_util.SortPositions(new_x)
+        if pos is not None: new_x, new_y = new_x[pos], new_y[pos]
+        n, x_old = len(self.x), self.x
+        IsOrdered = (n == 0) or (len(new_x) == 0) or bool(new_x[0] >= x_old[-1])
+        with util.Stage(type(self).__name__ + '.append', len(new_x)):
+            self.x = AppendArray(x_old, new_x)
+            setattr(self, y_attr, AppendArray(getattr(self, y_attr), new_y))
+        if not IsOrdered: return Graphlet.SortByX(self, y_attr)
+        self.x = SharedXArray(self.x)
+        ExtendXPlotBuffer(x_old, self.x)
+        Graphlet.ExtendWindow(self, n)
+
+    def ExtendWindow(self, n_old):
+        """
+        Update the window after rows were appended in order after position n_old
+
+        The cached window arrays are kept if the new rows fall outside t_range and are
+        extended by the child's ExtendSliceArrays (mapping only the tail) if they
+        continue the window; otherwise they are recomputed when next requested
+        """
+        window_old, cache = self.window, self.window_cache
+        self.window = pd_util.WindowPositions(self.x, self.t_range)
+        if (cache is None) or (self.window == window_old): return
+        if (self.window[0] == window_old[0]) and (window_old[1] == n_old):
+            self.window_cache = self.ExtendSliceArrays(cache, window_old[0], window_old[1], self.window[1])
+        else:
+            self.window_cache = None
+
+    def SetWindow(self, t_range):
+        """
+        Select the points within t_range (inclusive) for plotting
+
+        Binary search of the sorted x-data, so re-windowing (zoom, pan or stepping
+        through time) costs O(log n); the heading moves to the new window's start
+
+        Args:
+        t_range [tuple - datetime format] - (start, end) of the window
+        """
+        self.t_range = t_range
+        self.window = pd_util.WindowPositions(self.x, t_range)
+        self.window_cache = None
+        Graphlet.UpdateLabelCoords(self)
+
+    def WindowArrays(self):
+        """
+        Return x and y arrays of the window's points in plot (Matplotlib) units
+
+        x is a slice of the shared plot-unit x buffer (XPlotBuffer) unless decimated.
+
+        Computed by the child's SliceArrays on first call and cached until the window
+        or data change
+        """
+        if self.window_cache is None:
+            with util.Stage(type(self).__name__ + '.window', self.window[1] - self.window[0]):
+                self.window_cache = self.SliceArrays(self.window[0], self.window[1])
+        return self.window_cache
+
+    def UpdateLabelCoords(self):
+        """Set heading and horizontal line positions from the graphlet's current ymin and ymax"""
+        self.heading_coords = (self.t_range[0], (self.ymax + 1 * self.spacing[1])) #Label's x-y position
+        self.ypos_hline = None
+        if self.IsHLine: self.ypos_hline = self.ymin - self.spacing[1]
+
+class GraphletCategorical(Graphlet):
+    """
+    Set attributes for categorical time-series plots. Map y-values to
+    specified categories
+
+    Child of Graphlet, which initializes common attributes between
+    GraphletCategorical and GraphletContinuous
+
+    y-data are stored as category codes (int8 for up to 127 categories, int16 up to
+    32767...) and the cats code table. Mapped y-values (ydata) and original values
+    (ydata_unscaled, as a Pandas Categorical) are derived from the codes when accessed
+
+    Attributes:
+    See Parent Class docstring for its attributes
+
+    ticklabels - dictionary of categorical keys (in terms of unmapped y-data)
+                  and values that are labels to use on the plot for data series
+    cat_ticks - dictionary of categories (unmapped y-data) and their tick values
+    codes [numpy integer array] - position in cats of each y-value; -1 for nulls
+    cats [list] - categories (unmapped y-data) in tick order
+    IsSpans [boolean] - Optional toggle to draw state spans instead of one dot per sample.
+            Each category's consecutive samples are run-length encoded into spans that
+            last until the next sample (see pd_util.RunLengthSpans), drawn as one bar row
+            per category
+    span_gap - Optional maximum time (Timedelta or string such as '1h'; numeric for
+            numeric x-data) bridged by a span. Use about the sampling interval for flag
+            data, which only has samples while the flag is on
+
+    Methods:
+    Append
+    AddCategory
+    YArray
+    SliceArrays
+    Spans
+    ydata, ydata_unscaled (properties)
+    CreateCombinedFlagColSeries
+    CombinedFlagColsFromDF
+    CalculateYLimitsCategorical
+    SeriesFromDFCols
+
+    Version: 8/7/20 JDL Data Delve LLC
+    """
+    __slots__ = ('codes', 'cats', 'ticklabels', 'cat_ticks', 'IsSpans', 'span_gap')
+
+    def __init__(self, t_range, spacing, ylims, data, IsHLine, ticklabels=None, heading=None, dot_format=None,
+                 IsSpans=False, span_gap=None):
+
+        #Generate y-limits, ticklist and labels for categorical plot (sorted category order)
+        nrows = len(data[1])
+        with util.Stage('GraphletCategorical.categories', nrows):
+            codes, lst_cats = pd_util.FactorizeSer(data[1])
+        ncats = len(lst_cats)
+        self.ymin, self.ymax = GraphletCategorical.CalculateYLimitsCategorical(ylims, ncats, spacing)
+
+        Graphlet.__init__(self, t_range, spacing, ylims, data, IsHLine, heading, dot_format)
+        self.IsSpans, self.span_gap = IsSpans, span_gap
+
+        with util.Stage('GraphletCategorical.ticks', ncats):
+            self.ticklabels = ticklabels
+            self.ticklist, self.labels = [], []
+            for i, cat in zip(range(0,ncats), lst_cats):
+                self.ticklist.append(self.ymin+ (i * spacing[0]))
+                if ticklabels is not None:
+                    self.labels.append(ticklabels[cat])
+                else:
+                    self.labels.append(cat)
+            self.cat_ticks = dict(zip(lst_cats, self.ticklist))
+
+        #Keep compact codes sorted by x; mapping to ticklist values is deferred to plotting
+        with util.Stage('GraphletCategorical.sort', nrows):
+            self.cats = lst_cats
+            self.codes = codes.astype(pd_util.CodesDtype(ncats))
+            Graphlet.SortByX(self, 'codes')
+
+    @property
+    def ydata(self):
+        """y-data mapped to tick values (NaN for nulls) as a Pandas Series"""
+        return pd.Series(self.YArray(), name=self.name, copy=False)
+
+    @property
+    def ydata_unscaled(self):
+        """Unmapped y-data as a Pandas Series of Categorical values decoded from codes"""
+        return pd.Series(pd.Categorical.from_codes(self.codes, categories=self.cats), name=self.name)
+
+    def YArray(self, start=0, stop=None):
+        """Return float array of y-values (optionally positions start:stop) mapped to tick values (NaN for nulls)"""
+        return pd_util.MapCodesToVals(self.codes[start:stop], [self.cat_ticks[cat] for cat in self.cats])
+
+    def SliceArrays(self, start, stop):
+        """Return plot-unit x and mapped y arrays of positions start:stop"""
+        return XPlotBuffer(self.x)[start:stop], self.YArray(start, stop)
+
+    def ExtendSliceArrays(self, arrays, start, stop, stop_new):
+        """Return window arrays of positions start:stop extended to stop_new, mapping only the new rows"""
+        return XPlotBuffer(self.x)[start:stop_new], AppendArray(arrays[1], self.YArray(stop, stop_new))
+
+    def Spans(self):
+        """
+        Run-length encode the window's samples into state spans
+
+        Returns:
+        list (in cats order) of numpy arrays of (x start, width) rows in Matplotlib x units
+        """
+        start, stop = self.window
+        max_gap = self.span_gap
+        if (max_gap is not None) and np.issubdtype(self.x.dtype, np.datetime64):
+            max_gap = pd.Timedelta(max_gap) / pd.Timedelta(days=1)
+        with util.Stage('GraphletCategorical.spans', stop - start):
+            run_codes, x_start, x_end = pd_util.RunLengthSpans(self.codes[start:stop], XPlotBuffer(self.x)[start:stop], max_gap)
+            pos = np.argsort(run_codes, kind='stable')
+            bounds = np.searchsorted(run_codes[pos], np.arange(len(self.cats) + 1))
+            xranges = np.column_stack([x_start, x_end - x_start])[pos]
+        return [xranges[bounds[k]:bounds[k+1]] for k in range(len(self.cats))]
+
+    def Append(self, new_x, new_y):
+        """
+        Append rows to the graphlet, mapping only the new y-data
+
+        Reuses the existing category-to-tick mapping; categories not seen before are
+        added with AddCategory. Rows are appended with Graphlet.AppendRows
+
+        Args:
+        new_x (Pandas Series) - x-data to append
+        new_y (Pandas Series) - unmapped y-data to append
+
+        Returns:
+        Pandas Series of the mapped new y-data
+        """
+        codes, lst_cats = pd_util.FactorizeSer(new_y)
+        for cat in lst_cats:
+            if not cat in self.cat_ticks: self.AddCategory(cat)
+        ser_mapped = pd.Series(pd_util.MapCodesToVals(codes, [self.cat_ticks[cat] for cat in lst_cats]),
+                               index=new_y.index, name=self.name)
+
+        #Translate new codes to positions in the graphlet's code table
+        dict_pos = dict(zip(self.cats, range(len(self.cats))))
+        lookup = np.array([dict_pos[cat] for cat in lst_cats] + [-1], dtype='int64')
+        dtype = pd_util.CodesDtype(len(self.cats))
+        self.codes = self.codes.astype(dtype, copy=False)
+        Graphlet.AppendRows(self, 'codes', new_x, lookup[codes].astype(dtype))
+        return ser_mapped
+
+    def AddCategory(self, cat):
+        """
+        Add a tick for a new category without moving existing ticks
+
+        The graphlet grows away from its anchored y-limit (upward if anchored by ymin and
+        downward if anchored by ymax). Label comes from ticklabels if it has the category
+        """
+        if self.ylims[0] is not None:
+            self.ymax = self.ymax + self.spacing[0]
+            tick = self.ymax
+        else:
+            self.ymin = self.ymin - self.spacing[0]
+            tick = self.ymin
+        self.cats.append(cat)
+        self.cat_ticks[cat] = tick
+        self.ticklist.append(tick)
+        label = cat
+        if (self.ticklabels is not None) and (cat in self.ticklabels): label = self.ticklabels[cat]
+        self.labels.append(label)
+        self.window_cache = None
+        Graphlet.UpdateLabelCoords(self)
+
+    def CreateCombinedFlagColSeries(lst_flags):
+        """
+        Create Concatenated Series with mapped flag values and create dictionary of original
+        flag column names or labels by value.
+
+        Designed to work on columns that use 1/blank to flag time series discrete
+        events. This function maps multiple such columns to alternate integers and
+        concatenates the result into a single series.  The returned dictionary decodes
+        how integers and original column names (or integers and user-specified labels)
+        match up.
+
+        Args:
+        lst_flags (list of 3-item or, optionally, 4-item tuples) describing one or more
+                    series to be concatenated:
+                    df name - name of Pandas DataFrame containing valuecol and indexcol
+                    valuecol - column in df to serve as returned series values
+                    indexcol - column in df to serve as returned series index
+                    label string [optional] - Description for plot labeling
+
+        Returns:
+        Concatenated Series with original values mapped to integers
+        Dictionary of integer (keys) to original column names (values)
+        """
+
+        #Flags that share one DataFrame and index column are combined in a single pass
+        if len(set((id(flag[0]), flag[2]) for flag in lst_flags)) == 1:
+            df, indexcol = lst_flags[0][0], lst_flags[0][2]
+            lst_valuecols = [flag[1] for flag in lst_flags]
+            lst_labels = [flag[3] if len(flag) == 4 else None for flag in lst_flags]
+            return GraphletCategorical.CombinedFlagColsFromDF(df, indexcol, lst_valuecols, lst_labels)
+
+        lst_flag_series, ticklabels = [], {}
+        for flag, i in zip(lst_flags, range(0,len(lst_flags))):
+
+            #Default to None label then check whether it's specified
+            label = None
+            if len(flag) == 3: (df, valuecol, indexcol) = flag
+            if len(flag) == 4: (df, valuecol, indexcol, label) = flag
+
+            #Create a series from flag and append it to list of such series
+            ser = pd_util.SeriesFromDFCols(df, valuecol, indexcol, 'int64')
+            ser = pd_util.MapSerToAltVals(ser, [1], [i+1])
+            lst_flag_series.append(ser)
+
+            #Add a label to dict --either column name or user-specified string
+            ticklabels[i+1] = ser.name
+            if not label is None: ticklabels[i+1] = label
+        return pd.concat(lst_flag_series), ticklabels
+
+    def CombinedFlagColsFromDF(df, indexcol, lst_valuecols, lst_labels=None):
+        """
+        Create the same combined Series and ticklabels dictionary as
+        CreateCombinedFlagColSeries from multiple flag columns of one DataFrame
+
+        Works in one vectorized pass over the 2-D block of flag values instead of
+        building, remapping and concatenating a Series per flag column. Non-null
+        values of the i-th column become events in channel i+1 (values of 1 are mapped
+        to i+1). Events are ordered by channel, then by row, as with concatenation
+
+        Args:
+        df (Pandas DataFrame) - DataFrame containing indexcol and lst_valuecols
+        indexcol (String) - column in df to serve as returned series index (e.g. time)
+        lst_valuecols (list of Strings) - flag columns in df
+        lst_labels (list of Strings or None) [optional] - Description for plot labeling
+                    of each flag column; None uses the column name
+
+        Returns:
+        Combined Series with original values mapped to integers
+        Dictionary of integer (keys) to original column names or labels (values)
+        """
+
+        #nonzero over the (channel, row) block returns events in channel-major order
+        block = df[lst_valuecols].to_numpy(dtype='float64', na_value=np.nan).T
+        ichannel, irow = np.nonzero(~np.isnan(block))
+        vals = block[ichannel, irow].astype('int64')
+        vals = np.where(vals == 1, ichannel + 1, vals)
+
+        ser = pd.Series(vals, index=df[indexcol].to_numpy()[irow])
+        ser.index.name = indexcol
+        if len(lst_valuecols) == 1: ser.name = lst_valuecols[0]
+
+        #Label each channel with either column name or user-specified string
+        ticklabels = {}
+        for i, col in enumerate(lst_valuecols):
+            ticklabels[i+1] = col
+            if (lst_labels is not None) and (lst_labels[i] is not None): ticklabels[i+1] = lst_labels[i]
+        return ser, ticklabels
+
+    def CalculateYLimitsCategorical(ylims, ncats, spacing):
+        """
+        Populate y-limits for Categorical plots from either upper or lower limit
+
+        Args:
+        ylims [tuple; number] - (lower, upper) y-limits; one may be None
+        ncats [integer] - number of categories
+        spacing [tuple; number] - (spacing between categories, spacing between graphlets) in y-axis limits
+
+        Returns:
+        individual ymin and ymax (calculation overrides specified values if ylims input has both specified)
+        """
+        if ylims[0] is not None:
+            ymin = ylims[0]
+            ymax = ymin + (ncats - 1) * spacing[0]
+        elif ylims[1] is not None:
+            ymax = ylims[1]
+            ymin = ymax - (ncats - 1) * spacing[0]
+        else:
+            return None, None
+        return ymin, ymax
+
+    def SeriesFromDFCols(df, valcol, indexcol, dtype=None):
+        """
+        Convert two DataFrame columns into a Series as index and values
+
+        args:
+        df (Pandas DataFrame) - DataFrame containing valcol and indexcol
+        valcol (String) - name of DataFrame column to return as Series values (and name of Series)
+        indexcol (String) - name of DataFrame column to return as Series index
+        dtype (Python dtype - typically int) - optional returned dtype of Series
+        """
+        ser = pd.Series(df[valcol].values, index=df[indexcol]).dropna()
+        ser.name = valcol
+        if not dtype is None: ser = ser.astype(dtype)
+        return ser
+
+class GraphletContinuous(Graphlet):
+    """
+    Set attributes for continuous variable graphlet
+    Optionally, rescale y-values for graphing
+
+    Child of Graphlet, which initializes common attributes between
+    GraphletCategorical and GraphletContinuous
+
+    y-data are stored once as a float array of unscaled values. Decimation and
+    rescaling to plot units are deferred to plotting and applied only to the
+    window's points (see Graphlet.WindowArrays)
+
+    Attributes:
+    See Parent Class docstring for its attributes
+
+    ticklabels - Optional dictionary of values (unscaled y units) as keys
+                      string labels as values
+    scale_orig - [tuple - numeric]: Upper and lower values in unscaled y-units
+                 for linear rescaling to plot y-axis units)
+    scale_scaled [tuple - numeric]: Upper and lower values in scaled y-units;
+                 used with scale_orig for linear rescaling of y-data
+    max_points [integer] - Optional point budget. If specified, the window's x and y
+                 data are decimated to at most max_points shape-preserving points
+                 (about twice the plot width in pixels is visually lossless)
+    decimation [string] - 'minmax' (default; bucket min/max) or 'lttb' (Largest-
+                 Triangle-Three-Buckets) method for max_points decimation
+    IsFloat32 [boolean] - Optional toggle to store y as float32 (half the memory;
+                 about 7 significant digits, ample for plotting)
+    IsDensity [boolean] - Optional toggle to render the graphlet as a density raster
+                 (point counts per pixel within its ylims band) instead of scatter
+                 dots. Render cost then depends on pixels rather than points
+    pyramid - Optional graphlet_plot.pyramid.Pyramid (or its folder path) of precomputed
+                 bucket aggregates of the y-data. If specified, plotting reads the
+                 pyramid level whose buckets best fill the plot's width in pixels
+                 (one bucket per pixel column; at most max_points/2 buckets if
+                 specified) over t_range and plots each bucket's min and max; data
+                 may then be None (no raw samples are kept)
+    y [numpy float array] - unscaled y-data
+    width_px [integer] - width of the plot's axes in pixels (set by GraphletPlot at render
+                 time; None before rendering)
+
+    Methods:
+    Append
+    YArray
+    SliceArrays
+    ExtendSliceArrays
+    PyramidArrays
+    SetPixelWidth
+    XRange
+    ydata, ydata_unscaled (properties)
+
+    Version: 8/6/20 JDL Data Delve LLC
+    """
+    __slots__ = ('y', 'IsScaled', 'scale_orig', 'scale_scaled', 'max_points', 'decimation', 'IsDensity', 'pyramid',
+                 'width_px')
+
+    def __init__(self, t_range, spacing, ylims, data, IsHLine, ticklabels=None, heading=None, scale_orig=None, scale_scaled=None, dot_format=None,
+                 max_points=None, decimation='minmax', IsFloat32=False, IsDensity=False, pyramid=None):
+
+        #Pyramid graphlets need no raw samples
+        if isinstance(pyramid, str):
+            from . import pyramid as graphlet_pyramid
+            pyramid = graphlet_pyramid.Pyramid(pyramid)
+        self.pyramid = pyramid
+        if data is None:
+            data = (pd.Series(np.array([], dtype='datetime64[ns]')), pd.Series(np.array([]), name=pyramid.name))
+
+        self.ymin = ylims[0]
+        self.ymax = ylims[1]
+        Graphlet.__init__(self, t_range, spacing, ylims, data, IsHLine, heading, dot_format)
+
+        IsScaled = False
+        if (scale_orig is not None) and (scale_scaled is not None): IsScaled=True
+        self.IsScaled, self.scale_orig, self.scale_scaled = IsScaled, scale_orig, scale_scaled
+        self.max_points, self.decimation = max_points, decimation
+        self.IsDensity = IsDensity
+        self.width_px = None
+
+        #Keep unscaled y-values sorted by x; decimation and rescaling are deferred to plotting
+        with util.Stage('GraphletContinuous.sort', len(data[1])):
+            self.y = pd.Series(data[1]).to_numpy(dtype='float32' if IsFloat32 else 'float64', na_value=np.nan)
+            Graphlet.SortByX(self, 'y')
+
+        #Build ticklist and tick label list
+        if not ticklabels is None:
+            with util.Stage('GraphletContinuous.ticks', len(ticklabels)):
+                self.ticklist, self.labels = [], []
+                for k, v in ticklabels.items():
+
+                    #Scale the tick value if needed
+                    k_scaled = k
+                    if IsScaled: k_scaled = pd_util.RescaleValue(k, scale_orig, scale_scaled)
+
+                    #Add tick and label to lists; If no specified label, tick value is the label
+                    self.ticklist.append(k_scaled)
+                    if v is not None:
+                        self.labels.append(v)
+                    else:
+                        self.labels.append(k_scaled)
+
+    @property
+    def ydata(self):
+        """Rescaled y-data (not decimated) as a Pandas Series"""
+        return pd.Series(self.YArray(), name=self.name, copy=False)
+
+    @property
+    def ydata_unscaled(self):
+        """Unscaled y-data as a Pandas Series view of y"""
+        return pd.Series(self.y, name=self.name, copy=False)
+
+    def YArray(self, start=0, stop=None):
+        """Return array of rescaled y-values (optionally positions start:stop)"""
+        y = self.y[start:stop]
+        if self.IsScaled: y = pd_util.RescaleSerValues(y, self.scale_orig, self.scale_scaled)
+        return y
+
+    def SliceArrays(self, start, stop):
+        """Return plot-unit x and rescaled y arrays of positions start:stop, decimated to max_points if specified"""
+        if self.pyramid is not None: return self.PyramidArrays()
+        x, y = XPlotBuffer(self.x)[start:stop], self.y[start:stop]
+        if self.max_points is not None:
+            with util.Stage('GraphletContinuous.decimate', len(y)):
+                pos = pd_util.DecimateSerPositions(x, y, self.max_points, self.decimation)
+                x, y = x[pos], y[pos]
+        if self.IsScaled:
+            with util.Stage('GraphletContinuous.rescale', len(y)):
+                y = pd_util.RescaleSerValues(y, self.scale_orig, self.scale_scaled)
+        return x, y
+
+    def ExtendSliceArrays(self, arrays, start, stop, stop_new):
+        """
+        Return window arrays of positions start:stop extended to stop_new, rescaling only the new rows
+
+        Decimated and pyramid windows are recomputed, since their buckets span the window
+        """
+        if (self.pyramid is not None) or (self.max_points is not None): return self.SliceArrays(start, stop_new)
+        y = self.y[start:stop_new]
+        if self.IsScaled: y = AppendArray(arrays[1], self.YArray(stop, stop_new))
+        return XPlotBuffer(self.x)[start:stop_new], y
+
+    def PyramidArrays(self):
+        """Return plot-unit x and rescaled y of the min and max of the pyramid buckets covering t_range"""
+        nbuckets = self.width_px if self.width_px is not None else PyramidBuckets
+        if self.max_points is not None: nbuckets = min(nbuckets, self.max_points // 2)
+        nbuckets = max(nbuckets, 1)
+        with util.Stage('GraphletContinuous.pyramid'):
+            dict_rows = self.pyramid.Read(self.t_range, nbuckets)
+            x = np.repeat(XPlotUnits(dict_rows['x']), 2)
+            y = np.column_stack([dict_rows['min'], dict_rows['max']]).ravel()
+            if self.IsScaled: y = pd_util.RescaleSerValues(y, self.scale_orig, self.scale_scaled)
+        return x, y
+
+    def SetPixelWidth(self, width_px):
+        """Set the plot's width in pixels, recomputing pyramid window arrays when next requested if it changed"""
+        if width_px == self.width_px: return
+        self.width_px = width_px
+        if self.pyramid is not None: self.window_cache = None
+
+    def XRange(self):
+        """Return the window's t_range in Matplotlib x units"""
+        lims = self.t_range
+        if np.issubdtype(self.x.dtype, np.datetime64): lims = [pd.Timestamp(t).to_datetime64() for t in lims]
+        return tuple(XPlotUnits(np.array(lims, dtype=self.x.dtype)))
+
+    def Append(self, new_x, new_y):
+        """
+        Append rows to the graphlet (see Graphlet.AppendRows), rescaling only the new y-data
+        for the return value
+
+        Args:
+        new_x (Pandas Series) - x-data to append
+        new_y (Pandas Series) - unscaled y-data to append
+
+        Returns:
+        Pandas Series of the (rescaled) new y-data
+        """
+        ser_scaled = new_y
+        if self.IsScaled: ser_scaled = pd_util.RescaleSerValues(new_y, self.scale_orig, self.scale_scaled)
+
+        Graphlet.AppendRows(self, 'y', new_x, pd.Series(new_y).to_numpy(dtype=self.y.dtype, na_value=np.nan))
+        return ser_scaled
+
+class GraphletPlot():
+    """
+    Render a stack of graphlets onto a single set of axes
+
+    Graphlets that share a dot format (color, size, transparency) are drawn together
+    as one Matplotlib PathCollection with a single color and size. That keeps Agg's
+    fast path of stamping one pre-rendered marker (per-point color or size arrays make
+    drawing about ten times slower). Density graphlets (GraphletContinuous with
+    IsDensity) are each drawn as one image of point counts binned at the pixel
+    resolution of their band. Span graphlets (GraphletCategorical with IsSpans) are
+    drawn with one broken_barh per category, so their artists and drawn shapes scale
+    with the number of state changes rather than samples. x-data are converted to plot
+    units once for the whole stack. Adds each graphlet's heading and horizontal line and
+    assembles the overall y-range, ticks and tick labels
+
+    Attributes:
+    graphlets [list] - GraphletCategorical and/or GraphletContinuous instances
+    t_range [tuple - datetime format] - the datetime range of plot data
+    spacing [tuple - numeric] - (spacing between categories, buffer between
+                                graphlets)
+    y_range [tuple - numeric] - (ymin, ymax) of the stack including buffers
+    ticks, labels [lists] - combined y-axis ticks and tick labels of the stack
+    collections [list] - Matplotlib PathCollection per dot format (set by Render)
+    formats [list] - (color, size, transparency) dot format of each collection
+    tails [list] - PathCollection (or None) per dot format of points appended by Append
+                 since the collection was last set (see AppendTail)
+    icollection [list of integers] - index in collections of each graphlet's points
+                 (None for density and span graphlets)
+    images [list] - Matplotlib AxesImage of each density graphlet (None for others)
+    spans [list] - list of Matplotlib broken_barh collections (one per category) of
+                 each span graphlet (None for others)
+    x, y [lists of numpy arrays] - each graphlet's points in plot units (set by Render)
+
+    Methods:
+    Render
+    Append
+    AppendTail
+    UpdateCollection
+    Scatter
+    SetWindow
+    StackArrays
+    SetPixelWidths
+    CollectionArrays
+    DrawDensity
+    DrawSpans
+    DrawRaster
+    UpdateTicks
+    """
+    def __init__(self, lst_graphlets, t_range, spacing):
+        self.graphlets = lst_graphlets
+        self.t_range = t_range
+        self.spacing = spacing
+        self.axes, self.collections, self.icollection, self.images, self.spans = None, [], [], [], []
+        self.formats, self.tails = [], []
+        self.annotations, self.hlines = [], []
+        self.UpdateTicks()
+
+    def UpdateTicks(self):
+        """Calculate the overall y-range and combine graphlet ticks and labels"""
+        y_range = (None, None)
+        self.ticks, self.labels = [], []
+        for g in self.graphlets:
+            y_range = UpdateYRange(g, y_range)
+            if hasattr(g, 'ticklist'): self.ticks, self.labels = self.ticks + g.ticklist, self.labels + g.labels
+        self.y_range = (y_range[0] - self.spacing[1], y_range[1] + self.spacing[1])
+
+    def StackArrays(self):
+        """
+        Collect the window data of the graphlets as plot-ready arrays
+
+        x arrays are views of the graphlets' shared plot-unit x buffers (not copies), so
+        graphlets with the same x-data add no x conversion time or memory
+
+        Returns:
+        lst_x [list of numpy float arrays] - x-data of each graphlet in Matplotlib date units
+        lst_y [list of numpy float arrays] - mapped/rescaled y-data of each graphlet
+        """
+        lst_arrays = [g.WindowArrays() for g in self.graphlets]
+        lst_x = [x for x, y in lst_arrays]
+        lst_y = [np.asarray(y, dtype='float64') for x, y in lst_arrays]
+        return lst_x, lst_y
+
+    def SetPixelWidths(self):
+        """Pass the axes' width in pixels to the graphlets that size their data to it (pyramid graphlets)"""
+        width_px = max(int(round(self.axes.get_window_extent().width)), 1)
+        for g in self.graphlets:
+            if hasattr(g, 'SetPixelWidth'): g.SetPixelWidth(width_px)
+
+    def CollectionArrays(self, k):
+        """Return x and y arrays of the points of all graphlets drawn in collection k"""
+        lst_i = [i for i, icoll in enumerate(self.icollection) if icoll == k]
+        if len(lst_i) == 1: return self.x[lst_i[0]], self.y[lst_i[0]]
+        return np.concatenate([self.x[i] for i in lst_i]), np.concatenate([self.y[i] for i in lst_i])
+
+    def DrawRaster(self, i):
+        """Draw (or redraw) graphlet i as a density image or as state spans"""
+        if getattr(self.graphlets[i], 'IsDensity', False): return self.DrawDensity(i)
+        return self.DrawSpans(i)
+
+    def DrawSpans(self, i):
+        """
+        Draw (or redraw) span graphlet i with one broken_barh per category row
+
+        Bars are centered on each category's tick with height half the category spacing,
+        in the graphlet's dot color and transparency. Edge lines keep single-sample
+        (zero-width) spans visible
+        """
+        g = self.graphlets[i]
+        if self.spans[i] is not None:
+            for artist in self.spans[i]: artist.remove()
+        height = 0.5 * g.spacing[0]
+        color, alpha = getattr(g, 'dotcolor', 'C0'), getattr(g, 'dot_transparency', 1.0)
+        self.spans[i] = []
+        for cat, xranges in zip(g.cats, g.Spans()):
+            tick = g.cat_ticks[cat]
+            self.spans[i].append(self.axes.broken_barh(xranges, (tick - height / 2, height),
+                                                       facecolors=color, edgecolors=color, linewidths=0.5,
+                                                       alpha=alpha))
+        return self.spans[i]
+
+    def DrawDensity(self, i):
+        """
+        Draw (or redraw) density graphlet i as one image in its t_range x (ymin, ymax) band
+
+        Points are counted per pixel of the band (from the axes' size in pixels and the
+        band's share of y_range). Colors run from a pale to the full dot color on a log
+        scale of counts; empty pixels are transparent
+        """
+        import matplotlib.colors as mcolors
+        g = self.graphlets[i]
+        if self.images[i] is not None: self.images[i].remove()
+        bbox = self.axes.get_window_extent()
+        nx = max(int(round(bbox.width)), 1)
+        ny = max(int(round(bbox.height * (g.ymax - g.ymin) / (self.y_range[1] - self.y_range[0]))), 1)
+        x_range = g.XRange()
+        grid = pd_util.DensityGrid(self.x[i], self.y[i], x_range, (g.ymin, g.ymax), (ny, nx))
+
+        rgb = mcolors.to_rgb(getattr(g, 'dotcolor', 'C0'))
+        cmap = mcolors.LinearSegmentedColormap.from_list('density', [tuple(0.8 + 0.2 * c for c in rgb), rgb])
+        norm = mcolors.LogNorm(vmin=1, vmax=max(grid.max(), 2))
+        self.images[i] = self.axes.imshow(np.ma.masked_equal(grid, 0), extent=(x_range[0], x_range[1], g.ymin, g.ymax),
+                                          origin='lower', aspect='auto', interpolation='nearest', cmap=cmap,
+                                          norm=norm, alpha=getattr(g, 'dot_transparency', 1.0))
+        return self.images[i]
+
+    def Render(self, axes, plottitle, x_strftime_format, sizes):
+        """
+        Draw the graphlet stack and format the plot
+
+        Args:
+        axes - Matplotlib axes to draw on
+        plottitle [string] - plot title
+        x_strftime_format [string] - date format for x tick labels
+        sizes [tuple - integers] - (y tick label, x tick label, title) font sizes
+
+        Returns:
+        axes
+        """
+        self.axes = axes
+        self.SetPixelWidths()
+        with util.Stage('GraphletPlot.stack'):
+            self.x, self.y = self.StackArrays()
+
+        #Group graphlets by dot format (color, size, transparency); density and span graphlets are drawn separately
+        dict_formats, self.icollection = {}, []
+        for g in self.graphlets:
+            if getattr(g, 'IsDensity', False) or getattr(g, 'IsSpans', False):
+                self.icollection.append(None)
+                continue
+            dot_format = (getattr(g, 'dotcolor', 'C0'), getattr(g, 'dotsize', 36), getattr(g, 'dot_transparency', 1.0))
+            if not dot_format in dict_formats: dict_formats[dot_format] = len(dict_formats)
+            self.icollection.append(dict_formats[dot_format])
+
+        axes.xaxis_date()
+        self.formats = list(dict_formats)
+        with util.Stage('GraphletPlot.collections', sum(len(x) for x in self.x)):
+            self.collections = [self.Scatter(*self.CollectionArrays(k), self.formats[k]) for k in range(len(self.formats))]
+        self.tails = [None] * len(self.formats)
+        self.images, self.spans = [None] * len(self.graphlets), [None] * len(self.graphlets)
+        with util.Stage('GraphletPlot.rasters'):
+            for i in range(len(self.graphlets)):
+                if self.icollection[i] is None: self.DrawRaster(i)
+
+        #Label each graphlet and add its optional horizontal line
+        self.annotations, self.hlines = [], []
+        for g in self.graphlets:
+            self.annotations.append(axes.annotate(g.heading, xy=g.heading_coords, xytext=g.heading_coords,
+                                                  horizontalalignment='left', verticalalignment='top'))
+            hline = None
+            if g.ypos_hline is not None: hline = axes.axhline(g.ypos_hline, ls='-', c='black', linewidth=0.5)
+            self.hlines.append(hline)
+
+        return FormatTimeSeriesGraphletPlot(axes, self.t_range, self.y_range, self.ticks, self.labels,
+                                            plottitle, x_strftime_format, sizes)
+
+    def Append(self, g, new_x, new_y):
+        """
+        Append rows to a rendered graphlet and update the plot's artists in place
+
+        Only the appended rows are mapped/rescaled and converted to plot units (see
+        Graphlet.AppendRows). Rows outside the graphlet's window leave the artists as
+        they are. Rows that extend the window in place are added to the tail collection
+        of its dot format (AppendTail); other window changes reset the collection with
+        UpdateCollection, and density/span rasters are redrawn. If the graphlet gained a
+        category, ticks, heading and horizontal line are updated too
+
+        Args:
+        g - graphlet instance in the plot's list of graphlets
+        new_x (Pandas Series) - x-data to append
+        new_y (Pandas Series) - unmapped/unscaled y-data to append
+        """
+        import matplotlib.ticker as mticker
+        i = self.graphlets.index(g)
+        nticks = len(getattr(g, 'ticklist', []))
+        cache = g.window_cache
+        g.Append(new_x, new_y)
+
+        #Redraw only if the window's points changed
+        x, y = g.WindowArrays()
+        if (cache is None) or (g.window_cache is not cache):
+            self.x[i], self.y[i] = x, np.asarray(y, dtype='float64')
+            if self.icollection[i] is None:
+                self.DrawRaster(i)
+            elif (cache is not None) and IsArrayPrefix(cache[0], x) and IsArrayPrefix(cache[1], y):
+                self.AppendTail(self.icollection[i], x[len(cache[0]):], y[len(cache[0]):])
+            else:
+                self.UpdateCollection(self.icollection[i])
+
+        #Reposition ticks and labels if graphlet's categories changed
+        if len(getattr(g, 'ticklist', [])) != nticks:
+            self.UpdateTicks()
+            self.axes.yaxis.set_major_locator(mticker.FixedLocator(self.ticks))
+            self.axes.set_yticklabels(self.labels)
+            ylo, yhi = self.axes.get_ylim()
+            self.axes.set_ylim(min(ylo, self.y_range[0]), max(yhi, self.y_range[1]))
+            self.annotations[i].xy = g.heading_coords
+            self.annotations[i].set_position(g.heading_coords)
+            if self.hlines[i] is not None: self.hlines[i].set_ydata([g.ypos_hline, g.ypos_hline])
+
+    def AppendTail(self, k, x, y):
+        """
+        Draw appended points of collection k in its tail collection
+
+        Matplotlib copies a collection's whole offsets array on set_offsets, so appended
+        points go to a small tail collection with the same dot format instead. Once the
+        tail exceeds TailPoints, it is merged into collection k (UpdateCollection)
+        """
+        if self.tails[k] is None: self.tails[k] = self.Scatter([], [], self.formats[k])
+        offsets = np.concatenate([self.tails[k].get_offsets(), np.column_stack([x, y])])
+        if len(offsets) > TailPoints: return self.UpdateCollection(k)
+        self.tails[k].set_offsets(offsets)
+
+    def UpdateCollection(self, k):
+        """Set collection k's points from its graphlets' window arrays and empty its tail"""
+        self.collections[k].set_offsets(np.column_stack(self.CollectionArrays(k)))
+        if self.tails[k] is not None: self.tails[k].set_offsets(np.zeros((0, 2)))
+
+    def Scatter(self, x, y, dot_format):
+        """Return a PathCollection of x-y points drawn with dot_format (color, size, transparency)"""
+        color, size, alpha = dot_format
+        return self.axes.scatter(x, y, s=size, color=color, alpha=alpha, edgecolors='w', linewidths=0.08 * np.sqrt(size))
+
+    def SetWindow(self, t_range, x_strftime_format=None):
+        """
+        Show a new time window on the rendered plot by updating its artists in place
+
+        Each graphlet re-selects its window by binary search and only the window's points
+        are mapped/rescaled; collections get them with set_offsets, density and span
+        graphlets are redrawn, headings move to the window start, x-limits and the date
+        tick locator follow the window and y-limits are set to the stack's y_range (so
+        pages don't depend on autoscaling of the first window). No new axes, collections
+        or labels are created. Used to step through pages of a long history (see
+        graphlet_plot.export.ExportPages)
+
+        Args:
+        t_range [tuple - datetime format] - (start, end) of the window
+        x_strftime_format [string] - optional new date format for x tick labels
+        """
+        from matplotlib.dates import DateFormatter
+        self.t_range = t_range
+        for g in self.graphlets: g.SetWindow(t_range)
+        self.SetPixelWidths()
+        with util.Stage('GraphletPlot.stack'):
+            self.x, self.y = self.StackArrays()
+        for k in range(len(self.collections)):
+            self.UpdateCollection(k)
+        for i in range(len(self.graphlets)):
+            if self.icollection[i] is None: self.DrawRaster(i)
+        for annotation, g in zip(self.annotations, self.graphlets):
+            annotation.xy = g.heading_coords
+            annotation.set_position(g.heading_coords)
+        self.axes.set_xlim(t_range)
+        self.axes.set_ylim(self.y_range)
+        self.axes.xaxis.set_major_locator(DateLocator(t_range))
+        if x_strftime_format is not None: self.axes.xaxis.set_major_formatter(DateFormatter(x_strftime_format))
+
+def FormatTimeSeriesGraphletPlot(axes, t_range, y_range, ticks, labels, plottitle, x_strftime_format, sizes):
+    """Apply custom formatting to the graphlet plot"""
+    import matplotlib.ticker as mticker
+    from matplotlib.dates import DayLocator, DateFormatter
+    axes.set(xlim=t_range)
+    axes.set_ylabel('')
+    axes.set_xlabel('')
+    axes.yaxis.set_major_locator(mticker.FixedLocator(ticks))
+
+    axes.xaxis.set_major_locator(DayLocator())
+    axes.xaxis.set_major_formatter(DateFormatter(x_strftime_format))
+    axes.set_yticklabels(labels, fontsize=sizes[0])
+    axes.set_title(plottitle, fontsize=sizes[2])
+    axes.set_yticklabels(labels)
+    axes.tick_params(axis='x', labelsize=sizes[1])
+    axes.tick_params(axis='y', labelsize=sizes[0])
+    return axes
+
+def DateLocator(t_range, max_ticks=15):
+    """Return a Matplotlib locator of at most about max_ticks day ticks (hour ticks for ranges under 2 days)"""
+    from matplotlib.dates import DayLocator, HourLocator
+    span = pd.Timestamp(t_range[1]) - pd.Timestamp(t_range[0])
+    if span >= timedelta(days=2): return DayLocator(interval=max(int(np.ceil(span.days / max_ticks)), 1))
+    return HourLocator(interval=max(int(np.ceil(span / timedelta(hours=1) / max_ticks)), 1))
+
+def XDataArray(x):
+    """
+    Return x-data as a NumPy array and its time zone (None unless the x-data are tz-aware)
+
+    tz-aware datetimes (a tz-aware Series/Index or an object array of aware datetimes)
+    become naive UTC datetime64[ns], the instants Matplotlib plots them at, so windows,
+    sorting and plot-unit conversion work as for naive datetimes
+    """
+    if isinstance(getattr(x, 'dtype', None), pd.DatetimeTZDtype):
+        tz = x.dtype.tz
+    else:
+        x = np.asarray(x)
+        if (x.dtype != object) or (len(x) == 0) or (getattr(x[0], 'tzinfo', None) is None): return x, None
+        tz = x[0].tzinfo
+    x = pd.DatetimeIndex(pd.to_datetime(x, utc=True)).tz_localize(None)
+    return x.to_numpy().astype('datetime64[ns]', copy=False), tz
+
+def XPlotUnits(x):
+    """Return x-data as a float array in Matplotlib units (date units for datetime64 x-data)"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        from matplotlib.dates import date2num
+        x = date2num(x)
+    return x.astype('float64', copy=False)
+
+#Canonical x-data arrays by signature and plot-unit conversions by array id (both weakly referenced)
+XBuffers = weakref.WeakValueDictionary()
+XPlotBuffers = {}
+
+def SharedXArray(x):
+    """
+    Return a previously registered x array with the same identity or contents as x, else register x
+
+    Arrays are matched by dtype, length and a sample of values, then confirmed by the same
+    memory (identity) or equal contents, so graphlets over the same time column share one
+    array. Only numeric and datetime arrays are shared
+    """
+    if not x.dtype.kind in 'iufmM': return x
+    key = (x.dtype.str, len(x), x[np.linspace(0, len(x) - 1, min(len(x), 16)).astype('int64')].tobytes())
+    x_shared = XBuffers.get(key)
+    if x_shared is not None:
+        IsSameMemory = (x_shared.__array_interface__['data'][0] == x.__array_interface__['data'][0]) and \
+                       (x_shared.strides == x.strides)
+        if IsSameMemory or np.array_equal(x_shared, x, equal_nan=True): return x_shared
+    XBuffers[key] = x
+    return x
+
+def XPlotBuffer(x):
+    """Return x in Matplotlib units, converting each x array once (cached while the array exists)"""
+    entry = XPlotBuffers.get(id(x))
+    if (entry is not None) and (entry[0]() is x): return entry[1]
+    with util.Stage('XPlotBuffer', len(x)):
+        x_plot = XPlotUnits(x)
+    XPlotBuffers[id(x)] = (weakref.ref(x, DropXPlotBuffer), x_plot)
+    return x_plot
+
+def DropXPlotBuffer(ref):
+    """Remove the plot-unit conversion of an x array once it is garbage collected"""
+    for key, entry in list(XPlotBuffers.items()):
+        if entry[0] is ref: del XPlotBuffers[key]
+
+def ExtendXPlotBuffer(x, x_new):
+    """Register the plot-unit conversion of x_new (x plus appended rows) by converting only the appended rows"""
+    entry = XPlotBuffers.get(id(x_new))
+    if (entry is not None) and (entry[0]() is x_new): return
+    entry = XPlotBuffers.get(id(x))
+    if (entry is None) or (entry[0]() is not x): return
+    x_plot = AppendArray(entry[1], XPlotUnits(x_new[len(x):]))
+    XPlotBuffers[id(x_new)] = (weakref.ref(x_new, DropXPlotBuffer), x_plot)
+
+#Buckets read from a pyramid graphlet's pyramid before it is rendered (see GraphletContinuous.PyramidArrays)
+PyramidBuckets = 1000
+
+#Maximum points of a collection's tail of appended points before it is merged (see GraphletPlot.AppendTail)
+TailPoints = 2**16
+
+def IsArrayPrefix(arr, arr_new):
+    """Return True if arr_new starts with arr's memory (arr_new extends arr in place; see AppendArray)"""
+    return (len(arr_new) >= len(arr)) and (arr.dtype == arr_new.dtype) and (arr.strides == arr_new.strides) and \
+           (arr.__array_interface__['data'][0] == arr_new.__array_interface__['data'][0])
+
+#Spare-capacity buffers of appended arrays: (weak reference, number of rows written) by buffer id
+ArrayBuffers = {}
+
+def AppendArray(arr, new):
+    """
+    Return arr extended by new, copying only new when arr's buffer has spare capacity
+
+    Arrays returned by AppendArray are prefix views of a buffer with about 50% spare
+    capacity. If no rows have been written after arr, new is written there; if the rows
+    after arr already equal new (another graphlet sharing arr appended the same rows),
+    the longer view is returned as is. Otherwise arr and new are copied to a new buffer,
+    so appends cost amortized O(new rows)
+    """
+    new = np.asarray(new).astype(arr.dtype, copy=False)
+    n, k = len(arr), len(new)
+    buf = arr.base
+    entry = ArrayBuffers.get(id(buf)) if buf is not None else None
+    if (entry is not None) and (entry[0]() is buf) and (n + k <= len(buf)) and \
+       (arr.__array_interface__['data'][0] == buf.__array_interface__['data'][0]) and (arr.strides == buf.strides):
+        if entry[1] == n:
+            buf[n:n + k] = new
+            ArrayBuffers[id(buf)] = (entry[0], n + k)
+            return buf[:n + k]
+        if (entry[1] >= n + k) and np.array_equal(buf[n:n + k], new, equal_nan=arr.dtype.kind in 'fcmM'):
+            return buf[:n + k]
+    buf = np.empty(n + k + (n + k) // 2 + 16, dtype=arr.dtype)
+    buf[:n], buf[n:n + k] = arr, new
+    ArrayBuffers[id(buf)] = (weakref.ref(buf, DropArrayBuffer), n + k)
+    return buf[:n + k]
+
+def DropArrayBuffer(ref):
+    """Remove the record of an append buffer once it is garbage collected"""
+    for key, entry in list(ArrayBuffers.items()):
+        if entry[0] is ref: del ArrayBuffers[key]
+
+def UpdateYRange(cls, y_range):
+    """Update tuple (min, max) based on Class instance min and max"""
+    ymin, ymax = y_range
+    if ymin is None: ymin = cls.ymin
+    if ymax is None: ymax = cls.ymax
+    if cls.ymin < ymin: ymin = cls.ymin
+    if cls.ymax > ymax: ymax = cls.ymax
+    return (ymin, ymax)
+
+def GraphletDataFromDF(config, df):
+    """
+    Build data and ticklabels dictionaries for each graphlet in config from a DataFrame
+
+    config['data_cols'] gives each graphlet's (x column, y column). For flag graphlets,
+    the y entry is a list of flag columns, optionally followed by a list of labels,
+    and the columns are combined with GraphletCategorical.CombinedFlagColsFromDF.
+    Pyramid graphlets (see IsPyramidGraphlet) read no columns; their data are None
+
+    Args:
+    config (Dict) - graphlet plot configuration (see BuildGraphletsFromConfig)
+    df (Pandas DataFrame) - data for the plot (may be None if all graphlets are pyramid graphlets)
+
+    Returns:
+    data (Dict) - (x-data, y-data) Series tuple (None for pyramid graphlets) by graphlet name
+    ticklabels (Dict) - ticklabels dictionary (or None) by graphlet name
+    """
+    data, ticklabels = {}, {}
+    for g in config['graphlets']:
+        ticklabels[g] = config.get('ticklabels', {}).get(g)
+        if IsPyramidGraphlet(config, g):
+            data[g] = None
+            continue
+        cols = config['data_cols'][g]
+        if isinstance(cols[1], (list, tuple)):
+            lst_labels = cols[2] if len(cols) > 2 else None
+            ser, ticklabels[g] = GraphletCategorical.CombinedFlagColsFromDF(df, cols[0], list(cols[1]), lst_labels)
+            data[g] = (pd.Series(ser.index.values), pd.Series(ser.values))
+        else:
+            data[g] = (df[cols[0]], df[cols[1]])
+    return data, ticklabels
+
+def IsPyramidGraphlet(config, g):
+    """Return True if graphlet g plots a pyramid (config['pyramid']) rather than DataFrame columns"""
+    return config.get('pyramid', {}).get(g) is not None
+
+def ConfigDataColumns(config):
+    """Return sorted list of the DataFrame columns named in config['data_cols'] (pyramid graphlets excluded)"""
+    cols = set()
+    for g in config['graphlets']:
+        if IsPyramidGraphlet(config, g): continue
+        entry = config['data_cols'][g]
+        cols.add(entry[0])
+        if isinstance(entry[1], (list, tuple)):
+            cols.update(entry[1])
+        else:
+            cols.add(entry[1])
+    return sorted(cols, key=repr)
+
+def BuildGraphletsFromConfig(config, df, t_range=None):
+    """
+    Create the list of graphlet class instances described by a configuration dictionary
+
+    config keys match the notebook's per-graphlet dictionaries (each keyed by graphlet
+    name): GraphletIsCategorical, dot_formats, headings, ylims, scale_orig, scale_scaled,
+    hline and (optional) ticklabels, max_points, IsFloat32, IsDensity, IsSpans, span_gap and
+    pyramid (folder path of a graphlet_plot.pyramid pyramid; such graphlets read the
+    pyramid instead of df and need no data_cols). Also:
+    graphlets [list] - graphlet names in plotting order
+    spacing [tuple - numeric] - (category spacing, y-buffer) in y-axis units
+    data_cols [Dict] - data columns by graphlet name (see GraphletDataFromDF)
+    plot [Dict] - optional plot settings: title, x_strftime_format, sizes, figsize,
+                  dpi, t_buffer_days (padding of data-derived t_range)
+
+    Args:
+    config (Dict) - graphlet plot configuration
+    df (Pandas DataFrame) - data for the plot (may be None if all graphlets are pyramid graphlets)
+    t_range [tuple - datetime format] - optional plot range; default is the range of the
+                                        x-data and pyramids padded by t_buffer_days
+
+    Returns:
+    list of graphlet instances
+    t_range
+    """
+    data, ticklabels = GraphletDataFromDF(config, df)
+    dict_pyramids = {g: config['pyramid'][g] for g in config['graphlets'] if IsPyramidGraphlet(config, g)}
+    for g, pyramid in dict_pyramids.items():
+        if isinstance(pyramid, str):
+            from . import pyramid as graphlet_pyramid
+            dict_pyramids[g] = graphlet_pyramid.Pyramid(pyramid)
+    if t_range is None:
+        lst_ranges = [(data[g][0].min(), data[g][0].max()) for g in data if data[g] is not None]
+        lst_ranges += [p.TimeRange() for p in dict_pyramids.values() if p.TimeRange() is not None]
+        t_buffer = timedelta(days=config.get('plot', {}).get('t_buffer_days', 1))
+        t_range = (min(pd.Timestamp(r[0]) for r in lst_ranges) - t_buffer,
+                   max(pd.Timestamp(r[1]) for r in lst_ranges) + t_buffer)
+
+    lst, spacing = [], config['spacing']
+    for g in config['graphlets']:
+        if config['GraphletIsCategorical'][g]:
+            lst.append(GraphletCategorical(t_range, spacing, config['ylims'][g], data[g], config['hline'][g],
+                                           ticklabels[g], config['headings'][g], config['dot_formats'][g],
+                                           IsSpans=config.get('IsSpans', {}).get(g, False),
+                                           span_gap=config.get('span_gap', {}).get(g)))
+        else:
+            lst.append(GraphletContinuous(t_range, spacing, config['ylims'][g], data[g], config['hline'][g],
+                                          ticklabels[g], config['headings'][g], config['scale_orig'][g],
+                                          config['scale_scaled'][g], config['dot_formats'][g],
+                                          max_points=config.get('max_points', {}).get(g),
+                                          IsFloat32=config.get('IsFloat32', {}).get(g, False),
+                                          IsDensity=config.get('IsDensity', {}).get(g, False),
+                                          pyramid=dict_pyramids.get(g)))
+    return lst, t_range
+
+def RenderGraphletFigure(config, df, fpath, t_range=None, fmt=None):
+    """
+    Build the graphlets described by config, render them and save the figure to fpath
+
+    Uses a standalone Matplotlib Figure (no pyplot state), so it works under the Agg
+    backend in batch and worker processes. File format follows the fpath extension
+    unless fmt (e.g. 'png' or 'svg') is specified; fpath may also be a file-like object
+    """
+    from matplotlib.figure import Figure
+    lst, t_range = BuildGraphletsFromConfig(config, df, t_range)
+    plot = config.get('plot', {})
+    fig = Figure(figsize=plot.get('figsize', (12,8)), dpi=plot.get('dpi', 100))
+    axes = fig.subplots(nrows=1, ncols=1)
+    axes.tick_params(axis='x', labelrotation=45)
+    GraphletPlot(lst, t_range, config['spacing']).Render(axes, plot.get('title', ''),
+                                                          plot.get('x_strftime_format', '%b-%-d-%Y'),
+                                                          plot.get('sizes', (12,14,24)))
+    with util.Stage('RenderGraphletFigure.savefig'):
+        fig.savefig(fpath, dpi=plot.get('dpi', 100), format=fmt)
+    return fpath
@@ -0,0 +1,197 @@
+"""
+Persistent multi-resolution aggregates of continuous time series
+
+A pyramid holds time-bucketed min, max, sum and count of a continuous series at
+power-of-two resolutions: level 0 buckets are base_width wide and level L buckets
+are base_width * 2**L wide, all aligned at t0 (the first sample time rounded down
+to a multiple of base_width). Only buckets with samples are stored. Each level's
+fields are raw binary files that are memory-mapped when read, described by
+manifest.json in the pyramid folder
+
+Example (streaming build from a large csv, then plotting a window):
+reader = pd.read_csv(file, usecols=['datetime', 'temp'], parse_dates=['datetime'], chunksize=10**6)
+BuildPyramid(((chunk['datetime'], chunk['temp']) for chunk in reader), 'temp_pyramid', '1s')
+GraphletContinuous(t_range, spacing, (0, 100), None, True, pyramid='temp_pyramid', ...)
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+
+#Stored fields of each level and their dtypes
+PyramidFields = [('bucket', 'int64'), ('min', 'float64'), ('max', 'float64'), ('sum', 'float64'), ('count', 'int64')]
+ManifestFile = 'manifest.json'
+
+def BuildPyramid(chunks, dir_pyramid, base_width, nlevels=20, name=None):
+    """
+    Build a pyramid in one streaming pass over (x, y) chunks
+
+    Args:
+    chunks (iterable) - (x-data, y-data) tuples of datetime and numeric Series or arrays;
+                        chunks must follow each other in time (rows within a chunk may be unsorted)
+    dir_pyramid (String) - output folder (created if needed)
+    base_width (Timedelta or string such as '1s') - level 0 bucket width
+    nlevels (Integer) - number of power-of-two levels
+    name (String) - optional series name (default: name of the first chunk's y-data)
+
+    Returns:
+    Pyramid opened from dir_pyramid
+    """
+    writer = PyramidWriter(dir_pyramid, base_width, nlevels, name)
+    for x, y in chunks:
+        writer.Add(x, y)
+    writer.Close()
+    return Pyramid(dir_pyramid)
+
+def AggregateBuckets(bucket, vmin, vmax, vsum, count):
+    """Combine rows with equal (sorted) bucket numbers into one row each with reduceat"""
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    return (bucket[starts], np.minimum.reduceat(vmin, starts), np.maximum.reduceat(vmax, starts),
+            np.add.reduceat(vsum, starts), np.add.reduceat(count, starts))
+
+class PyramidWriter():
+    """
+    Append chunks of samples to a pyramid's level files
+
+    Each chunk is aggregated into level 0 buckets and then cascaded to coarser levels
+    (bucket >> 1 per level). The last bucket of each level may continue in the next
+    chunk, so it is held back and merged until a later bucket arrives or Close is called
+
+    Methods:
+    Add
+    Close
+    """
+    def __init__(self, dir_pyramid, base_width, nlevels=20, name=None):
+        self.dir_pyramid = dir_pyramid
+        self.width = pd.Timedelta(base_width).value
+        self.nlevels = nlevels
+        self.name = name
+        self.t0 = None
+        self.pending = [None] * nlevels
+        self.lengths = [0] * nlevels
+        os.makedirs(dir_pyramid, exist_ok=True)
+        self.files = [[open(os.path.join(dir_pyramid, LevelFileName(L, field)), 'wb') for field, dtype in PyramidFields]
+                      for L in range(nlevels)]
+
+    def Add(self, x, y):
+        """Aggregate a chunk of x (datetime) and y (numeric) samples; null y-values are skipped"""
+        if self.name is None: self.name = getattr(y, 'name', None)
+        x = np.asarray(x).astype('datetime64[ns]').astype('int64')
+        y = np.asarray(y, dtype='float64')
+        valid = ~np.isnan(y)
+        x, y = x[valid], y[valid]
+        if len(x) == 0: return
+        pos = np.argsort(x, kind='stable')
+        x, y = x[pos], y[pos]
+        if self.t0 is None: self.t0 = int(x[0]) // self.width * self.width
+        bucket = (x - self.t0) // self.width
+        if (self.pending[0] is not None) and (bucket[0] < self.pending[0][0][0]):
+            raise ValueError('Pyramid chunks must follow each other in time')
+
+        rows = AggregateBuckets(bucket, y, y, y, np.ones(len(y), dtype='int64'))
+        for L in range(self.nlevels):
+            if L > 0: rows = AggregateBuckets(rows[0] >> 1, *rows[1:])
+            self.WriteLevel(L, rows)
+
+    def WriteLevel(self, L, rows):
+        """Merge a chunk's rows for level L with its pending bucket; write all but the last bucket"""
+        if self.pending[L] is not None:
+            rows = AggregateBuckets(*[np.concatenate([p, r]) for p, r in zip(self.pending[L], rows)])
+        self.pending[L] = [field[-1:] for field in rows]
+        self.Write(L, [field[:-1] for field in rows])
+
+    def Write(self, L, rows):
+        """Append rows to level L's field files"""
+        for f, field, (name, dtype) in zip(self.files[L], rows, PyramidFields):
+            f.write(np.ascontiguousarray(field, dtype=dtype).tobytes())
+        self.lengths[L] += len(rows[0])
+
+    def Close(self):
+        """Write pending buckets, close level files and write the manifest"""
+        for L in range(self.nlevels):
+            if self.pending[L] is not None: self.Write(L, self.pending[L])
+            for f in self.files[L]: f.close()
+        manifest = {'name': self.name, 't0': self.t0, 'base_width_ns': self.width, 'nlevels': self.nlevels,
+                    'fields': PyramidFields, 'lengths': self.lengths}
+        with open(os.path.join(self.dir_pyramid, ManifestFile + '.tmp'), 'w') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(os.path.join(self.dir_pyramid, ManifestFile + '.tmp'), os.path.join(self.dir_pyramid, ManifestFile))
+
+class Pyramid():
+    """
+    Read a pyramid built by BuildPyramid through memory-mapped level files
+
+    Attributes:
+    name - name of the aggregated series
+    t0 [numpy datetime64] - time at which buckets are aligned (multiple of base_width)
+    base_width [Pandas Timedelta] - level 0 bucket width
+    nlevels [integer] - number of levels
+
+    Methods:
+    Level
+    Read
+    TimeRange
+    """
+    def __init__(self, dir_pyramid):
+        self.dir_pyramid = dir_pyramid
+        with open(os.path.join(dir_pyramid, ManifestFile)) as f:
+            manifest = json.load(f)
+        self.name = manifest['name']
+        self.t0 = np.datetime64(manifest['t0'] if manifest['t0'] is not None else 0, 'ns')
+        self.width = manifest['base_width_ns']
+        self.base_width = pd.Timedelta(self.width, unit='ns')
+        self.nlevels = manifest['nlevels']
+        self.levels = []
+        for L, length in enumerate(manifest['lengths']):
+            dict_fields = {}
+            for field, dtype in manifest['fields']:
+                fpath = os.path.join(dir_pyramid, LevelFileName(L, field))
+                dict_fields[field] = np.memmap(fpath, dtype=dtype, mode='r', shape=(length,)) if length > 0 \
+                                     else np.zeros(0, dtype=dtype)
+            self.levels.append(dict_fields)
+
+    def Level(self, t_range, max_buckets):
+        """Return the finest level with at most max_buckets buckets spanning t_range"""
+        span = (pd.Timestamp(t_range[1]) - pd.Timestamp(t_range[0])).value
+        nbuckets = span / (self.width * max(max_buckets, 1))
+        L = int(np.ceil(np.log2(nbuckets))) if nbuckets > 1 else 0
+        return min(max(L, 0), self.nlevels - 1)
+
+    def Read(self, t_range, max_buckets):
+        """
+        Read the buckets of t_range at the level chosen by Level
+
+        Only the bucket rows within t_range (located by binary search of the level's
+        bucket numbers) are read from disk
+
+        Returns:
+        Dictionary of numpy arrays: x (bucket center times, datetime64), min, max, mean, count;
+        and level (integer)
+        """
+        L = self.Level(t_range, max_buckets)
+        width = self.width << L
+        lst_b = [(pd.Timestamp(t).to_datetime64().astype('datetime64[ns]') - self.t0).astype('int64') // width
+                 for t in t_range]
+        fields = self.levels[L]
+        start = int(np.searchsorted(fields['bucket'], lst_b[0], side='left'))
+        stop = int(np.searchsorted(fields['bucket'], lst_b[1], side='right'))
+        bucket = np.array(fields['bucket'][start:stop])
+        count = np.array(fields['count'][start:stop])
+        return {'x': self.t0 + (bucket * width + width // 2).astype('timedelta64[ns]'),
+                'min': np.array(fields['min'][start:stop]), 'max': np.array(fields['max'][start:stop]),
+                'mean': np.array(fields['sum'][start:stop]) / count, 'count': count, 'level': L}
+
+    def TimeRange(self):
+        """
+        Return (start, end) datetime64 times spanned by the pyramid's level 0 buckets (None if empty)
+
+        Only the first and last bucket numbers are read from the memory-mapped level file
+        """
+        bucket = self.levels[0]['bucket']
+        if len(bucket) == 0: return None
+        return (self.t0 + np.timedelta64(int(bucket[0]) * self.width, 'ns'),
+                self.t0 + np.timedelta64((int(bucket[-1]) + 1) * self.width, 'ns'))
+
+def LevelFileName(L, field):
+    """Return file name of a level's field"""
+    return 'L' + str(L) + '_' + field + '.bin'
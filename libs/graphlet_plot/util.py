@@ -0,0 +1,191 @@
+#Version 8/7/20
+# 8/7/20 Added PrintClass function
+
+import math
+import os
+import glob
+import shutil
+import time
+import tracemalloc
+import pandas as pd
+import numpy as np
+
+def IsNullVal(val):
+
+    """Return TRUE if val is null (nan)"""
+
+    if isinstance(val,float) and math.isnan(val): return True
+    return False
+
+#Set the environment for code - can convert to return a class
+def OSDefaults():
+
+    """Set OS-specific values"""
+
+    IsWindows, IsMacOS = False, False
+    if os.name == 'nt':
+        IsWindows = True
+        sep = '\\'
+    elif os.name == 'posix':
+        IsMacOS = True
+        sep = '/'
+    return sep
+
+#Returns the filename portion of a directory path
+def FileNameFromPath(pathplusfile, sep):
+
+    """Return the filename string from a directory path"""
+
+    return pathplusfile.split(sep)[-1]
+
+def ResetInitialAndFinalFolders(sPath_i, sPath_f, IsRemove, sFileType):
+
+    """Reset files in an initial/final sub-folder structure by either moving files back to initial
+       from final or, optionally, deleting all files from both subfolders
+
+    Args:
+        path_i (String): directory path of 'initial' sub-folder including final path separator
+        path_f (String): directory path of 'final' sub-folder  including final path separator
+        IsRemove (Boolean): toggle to either (TRUE) delete all files or (FALSE) move files in final
+                            sub-folder to initial without any deletions
+        sFileType (String): file specifier such as '*.csv' or '*.*' recognizable to glob.glob()
+
+    Returns:
+        i, j, k (Integers): numbers of files relocated, removed from initial and removed from
+                            final subfolders, respectively
+    """
+
+    i, j, k = 0, 0, 0
+    for f in glob.glob(sPath_f + sFileType):
+        if not IsRemove:
+            shutil.move(f, sPath_i)
+            i += 1
+        else:
+            os.remove(f)
+            j += 1
+    if IsRemove:
+        for f in glob.glob(sPath_i + sFileType):
+            os.remove(f)
+            k += 1
+    return i, j, k
+
+
+def FractionalDays(tdelta):
+    sec_day = 86400
+    return round(tdelta.total_seconds()/sec_day,1)
+
+def DatetimeDurationMin(dt_end, dt_begin):
+    return round((dt_end - dt_begin).total_seconds()/60,1)
+
+def DatetimeDurationHrs(dt_end, dt_begin):
+    return round((dt_end - dt_begin).total_seconds()/3600,1)
+
+def PrintClass(cls):
+    """Print all attribute values for a class instance (including __slots__ attributes)"""
+    lst_vars = list(getattr(cls, '__dict__', {}).items())
+    for c in type(cls).__mro__:
+        for name in c.__dict__.get('__slots__', ()):
+            if hasattr(cls, name): lst_vars.append((name, getattr(cls, name)))
+    for var in lst_vars:
+        if isinstance(var[1], pd.DataFrame) | isinstance(var[1], pd.Series):
+            print('\n',var[0], '\n', var[1], '\n\n')
+        else:
+            print(var[0], ': ', var[1])
+
+#StageStats instance recording Stage timings; None (default) disables recording
+StageRecorder = None
+
+class StageStats():
+    """
+    Record wall time, row count and allocated bytes of instrumented stages (Stage blocks in
+    graphlet construction and rendering) while active
+
+    Use as a context manager or call Start and Stop:
+        with util.StageStats() as stats:
+            g = graphlet_plot.GraphletCategorical(...)
+        stats.Summary()
+
+    Attributes:
+    records [list of dicts] - stage name, seconds, rows and bytes (net bytes allocated;
+                              None unless IsTraceMemory) in order of completion
+    callback [function] - optional function called with each record as it is made
+                          (e.g. to send to a metrics pipeline)
+    IsTraceMemory [boolean] - toggles tracemalloc measurement of allocated bytes
+
+    Methods:
+    Start
+    Stop
+    Summary
+    """
+    def __init__(self, callback=None, IsTraceMemory=False):
+        self.records = []
+        self.callback = callback
+        self.IsTraceMemory = IsTraceMemory
+        self.IsStartedTrace = False
+        self.prev_recorder = None
+
+    def Start(self):
+        """Make this the active recorder (and start tracemalloc if needed)"""
+        global StageRecorder
+        self.prev_recorder, StageRecorder = StageRecorder, self
+        if self.IsTraceMemory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.IsStartedTrace = True
+        return self
+
+    def Stop(self):
+        """Restore the previously active recorder (and stop tracemalloc if started here)"""
+        global StageRecorder
+        StageRecorder = self.prev_recorder
+        if self.IsStartedTrace:
+            tracemalloc.stop()
+            self.IsStartedTrace = False
+
+    def __enter__(self):
+        return self.Start()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.Stop()
+        return False
+
+    def Add(self, record):
+        self.records.append(record)
+        if self.callback is not None: self.callback(record)
+
+    def Summary(self):
+        """Return DataFrame of total seconds, rows, bytes and count by stage"""
+        df = pd.DataFrame(self.records, columns=['stage', 'seconds', 'rows', 'bytes'])
+        df_summary = df.groupby('stage', sort=False).agg(seconds=('seconds', 'sum'), rows=('rows', 'sum'),
+                                                          bytes=('bytes', 'sum'), count=('seconds', 'size'))
+        return df_summary
+
+class Stage():
+    """
+    Context manager that times a named stage into the active StageStats recorder
+
+    Does nothing beyond a recorder check if no StageStats is active
+
+    Args:
+    name [String] - stage name such as 'GraphletCategorical.mapping'
+    rows [Integer] - optional number of rows processed by the stage
+    """
+    __slots__ = ('name', 'rows', 'recorder', 't_start', 'mem_start')
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.recorder = StageRecorder
+
+    def __enter__(self):
+        if self.recorder is None: return self
+        self.mem_start = None
+        if self.recorder.IsTraceMemory: self.mem_start = tracemalloc.get_traced_memory()[0]
+        self.t_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.recorder is None: return False
+        seconds = time.perf_counter() - self.t_start
+        nbytes = None
+        if self.mem_start is not None: nbytes = tracemalloc.get_traced_memory()[0] - self.mem_start
+        self.recorder.Add({'stage':self.name, 'seconds':seconds, 'rows':self.rows, 'bytes':nbytes})
+        return False
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from graphlet_plot import pd_util
+
+def test_top_item_wide_grouping_does_not_overflow_keys():
+    """Five columns of 20k unique values exceed int64 mixed-radix keys; result must match groupby"""
+    rng = np.random.default_rng(0)
+    n = 20003
+    df = pd.DataFrame({col: rng.permutation(20000).repeat(2)[:n - 3].astype(str) for col in 'abcde'})
+    df = pd.concat([df, pd.DataFrame([['x'] * 5] * 3, columns=list('abcde'))], ignore_index=True)
+    ser = df.groupby(list('abcde')).size()
+
+    desc, ct = pd_util.TopItemCtAndDesc(df, list('abcde'))
+    assert (desc, ct) == (ser.idxmax(), ser.max()) == (('x',) * 5, 3)
+
+def test_top_items_ties_rank_in_sorted_group_order():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'a': rng.integers(0, 20, 500), 'b': rng.integers(0, 20, 500)})
+    for k in [1, 3, 5]:
+        ser = df.groupby(['a', 'b']).size().sort_index().sort_values(ascending=False, kind='stable')[:k]
+        expected = list(zip(ser.index, ser.values))
+        result = pd_util.TopItemsCtAndDesc(df, [['a', 'b']], k=k)[0]
+        assert result == (expected[0] if k == 1 else expected)